@@ -10,7 +10,6 @@ FIXED: Registrierung-Reihenfolge korrigiert für CollectionProperty
 """
 
 import bpy
-import requests
 import json
 import os
 from pathlib import Path
@@ -89,6 +88,8 @@ class BIM_OT_connect_ids_server(Operator):
     
     def _fetch_bim_portal_models(self):
         """Lädt Fachmodelle vom BIM Portal mit echter API."""
+        # Lazy import: requests erst bei der ersten Server-Anfrage laden, nicht beim Addon-Start
+        import requests
         
         try:
             # POST Request wie im BIMPortalConnector.py
@@ -238,6 +239,7 @@ class BIM_OT_download_domain_model_ids(Operator):
     
     def _fetch_ids_from_bim_portal(self, guid: str) -> str:
         """Lädt IDS-Inhalt im Hintergrund vom BIM Portal."""
+        import requests
         
         try:
             # GET Request für IDS XML (wie im BIMPortalConnector.py)
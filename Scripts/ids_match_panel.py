@@ -11,77 +11,316 @@ Fuegt Match-Funktionalitaet hinzu:
 
 import bpy
 import json
+import logging
 import xml.etree.ElementTree as ET
+from sys import intern
+from array import array
+from functools import lru_cache
 from pathlib import Path
-from bpy.types import Operator, Panel, PropertyGroup
+from bpy.app.handlers import persistent
+from bpy.types import Operator, Panel, PropertyGroup, UIList, UI_UL_list
 from bpy.props import StringProperty, BoolProperty, CollectionProperty, IntProperty, EnumProperty
 
+# orjson ist optional (schnellerer JSON-Parser), Fallback auf stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Zusaetzliche Diagnose-Ausgaben (z.B. doppelte Entity-Keys) beim Parsen
+ENABLE_VERBOSE = False
+
+log = logging.getLogger(__name__)
+if ENABLE_VERBOSE and not log.handlers:
+    log.setLevel(logging.DEBUG)
+    log.addHandler(logging.StreamHandler())
+
 # IDS Parser Integration
-def get_namespaces(root):
-    """Extract default namespace dynamically from root element."""
-    if root.tag.startswith("{"):
-        uri = root.tag.split("}")[0].strip("{")
+@lru_cache(maxsize=None)
+def _namespaces_for_tag(root_tag):
+    if root_tag.startswith("{"):
+        uri = root_tag.split("}")[0].strip("{")
         return {"ids": uri}
     else:
         return {"ids": ""}  # no namespace
 
+def get_namespaces(root):
+    """Extract default namespace dynamically from root element."""
+    return _namespaces_for_tag(root.tag)
+
+@lru_cache(maxsize=None)
+def get_ids_paths(uri):
+    """Build the ElementTree paths used by parse_ids once per namespace.
+
+    Die Pfade sind bereits in Clark-Notation ({uri}tag) aufgeloest, damit
+    find/findtext kein Namespace-Mapping mehr pro Aufruf auswerten muss.
+    """
+    ns = f"{{{uri}}}" if uri else ""
+    return {
+        "specifications": f"{ns}specifications",
+        "specification": f"{ns}specification",
+        "applicability": f"{ns}applicability",
+        "requirements": f"{ns}requirements",
+        "entity": f"{ns}entity",
+        "property": f"{ns}property",
+        "name": f"{ns}name/{ns}simpleValue",
+        "predefinedType": f"{ns}predefinedType/{ns}simpleValue",
+        "propertySet": f"{ns}propertySet/{ns}simpleValue",
+        "baseName": f"{ns}baseName/{ns}simpleValue",
+    }
+
+# Gemeinsame Tabelle fuer zusammengesetzte Entity-Keys (IFC-Klasse + PredefinedType)
+_entity_key_cache = {}
+
+def get_entity_key(name, predefined):
+    """Return the interned key 'Entity.PredefinedType' (or just 'Entity')."""
+    cache_key = (name, predefined)
+    entity_key = _entity_key_cache.get(cache_key)
+    if entity_key is None:
+        entity_key = intern(f"{name}.{predefined}" if predefined else name)
+        _entity_key_cache[cache_key] = entity_key
+    return entity_key
+
 def parse_ids(xml_file):
     """Parse IDS file to JSON structure."""
     tree = ET.parse(xml_file)
     root = tree.getroot()
     NS = get_namespaces(root)
+    P = get_ids_paths(NS["ids"])
 
     result = {}
 
-    specifications = root.find("ids:specifications", NS)
+    specifications = root.find(P["specifications"])
     if specifications is None:
         return result
 
-    for spec in specifications.findall("ids:specification", NS):
+    for spec in specifications.findall(P["specification"]):
         spec_name = spec.get("name", "")
-        applicability = spec.find("ids:applicability", NS)
-        requirements = spec.find("ids:requirements", NS)
+        applicability = spec.find(P["applicability"])
+        requirements = spec.find(P["requirements"])
 
         if applicability is None or requirements is None:
             continue
 
-        for entity in applicability.findall("ids:entity", NS):
-            name = entity.findtext("ids:name/ids:simpleValue", default="", namespaces=NS)
-            predefined = entity.findtext("ids:predefinedType/ids:simpleValue", default="", namespaces=NS)
+        # PropertySet/baseName-Paare einmal pro Spezifikation lesen (gilt fuer alle Entities)
+        spec_properties = []
+        for prop in requirements.findall(P["property"]):
+            prop_set = prop.findtext(P["propertySet"], "")
+            if prop_set:
+                spec_properties.append((intern(prop_set), intern(prop.findtext(P["baseName"], ""))))
 
-            # Build entity key: Entity.PredefinedType (or just Entity if no predefinedType)
-            if predefined:
-                entity_key = f"{name}.{predefined}"
-            else:
-                entity_key = name
+        for entity in applicability.findall(P["entity"]):
+            name = entity.findtext(P["name"], "")
+            predefined = entity.findtext(P["predefinedType"], "")
 
-            # Duplicate check
-            if entity_key in result:
-                print(f"WARNING: Duplicate entity key '{entity_key}' found")
+            # Build entity key: Entity.PredefinedType (or just Entity if no predefinedType)
+            entity_key = get_entity_key(name, predefined)
 
-            # Ensure structure exists
-            if entity_key not in result:
-                result[entity_key] = {
+            # Ensure structure exists (Duplicate check nur im Verbose-Modus)
+            entry = result.get(entity_key)
+            if entry is None:
+                entry = result[entity_key] = {
                     "name": spec_name,  # store specification name
                     "properties": {}
                 }
+            else:
+                log.debug("Duplicate entity key '%s' found", entity_key)
 
             # Add properties
-            for prop in requirements.findall("ids:property", NS):
-                prop_set = prop.findtext("ids:propertySet/ids:simpleValue", default="", namespaces=NS)
-                base_name = prop.findtext("ids:baseName/ids:simpleValue", default="", namespaces=NS)
-
-                if prop_set:
-                    if prop_set not in result[entity_key]["properties"]:
-                        result[entity_key]["properties"][prop_set] = {}
+            properties = entry["properties"]
+            for prop_set, base_name in spec_properties:
+                pset_dict = properties.setdefault(prop_set, {})
 
-                    if base_name:
-                        # Create empty node for baseName
-                        if base_name not in result[entity_key]["properties"][prop_set]:
-                            result[entity_key]["properties"][prop_set][base_name] = {}
+                if base_name:
+                    # Create empty node for baseName
+                    pset_dict.setdefault(base_name, {})
 
     return result
 
+def load_json(file_path):
+    """Load a JSON file, using orjson when available."""
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def get_sidecar_path(ids_path):
+    """Pfad der vorkompilierten JSON-Datei neben der IDS-Datei."""
+    # Voller Dateiname, damit foo.ids und foo.xml nicht dasselbe Sidecar teilen
+    path = Path(ids_path)
+    return path.with_name(path.name + ".json")
+
+# Bei Aenderungen an parse_ids hochzaehlen, damit alte Sidecars neu geparst werden
+SIDECAR_FORMAT = 1
+
+def get_source_stamp(ids_path):
+    """(st_mtime_ns, st_size) der IDS-Datei, wird im Sidecar gespeichert."""
+    st = Path(ids_path).stat()
+    return [st.st_mtime_ns, st.st_size]
+
+def write_sidecar(ids_path, json_data, source_stamp):
+    """Schreibt das Sidecar mit Format-Version und Stempel der Quelldatei."""
+    sidecar = get_sidecar_path(ids_path)
+    payload = {"format": SIDECAR_FORMAT, "source": source_stamp, "data": json_data}
+    if orjson is not None:
+        sidecar.write_bytes(orjson.dumps(payload))
+    else:
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+    return sidecar
+
+def is_sidecar(payload):
+    """True fuer ein von write_sidecar geschriebenes Sidecar im aktuellen Format."""
+    return isinstance(payload, dict) and payload.get("format") == SIDECAR_FORMAT and "data" in payload
+
+def load_json_or_sidecar(file_path):
+    """Load a JSON file; a directly opened sidecar (foo.ids.json) yields its IDS data."""
+    payload = load_json(file_path)
+    if is_sidecar(payload):
+        return payload["data"]
+    return payload
+
+def load_ids_or_cache(ids_path):
+    """Parse IDS file, preferring an up-to-date precompiled <name>.json sidecar (e.g. foo.ids.json)."""
+    sidecar = get_sidecar_path(ids_path)
+    try:
+        payload = load_json(sidecar)
+    except FileNotFoundError:
+        payload = None  # Kein Sidecar vorhanden - normal parsen
+    except ValueError:
+        payload = None  # Defektes Sidecar (orjson.JSONDecodeError ist ein ValueError)
+
+    # mtime-Vergleich der beiden Dateien reicht nicht: cp -p oder Entpacken behalten alte mtimes
+    if is_sidecar(payload) and payload.get("source") == get_source_stamp(ids_path):
+        print(f"Using precompiled IDS: {sidecar}")
+        return payload["data"]
+
+    print(f"Parsing IDS file: {ids_path}")
+    return parse_ids(ids_path)
+
+# Loader je Dateiendung fuer SIMPLE_OT_analyze_ids
+LOADERS = {
+    '.json': load_json_or_sidecar,
+    '.ids': load_ids_or_cache,
+    '.xml': load_ids_or_cache,
+}
+
+class TreeArrays:
+    """Flacher Tree als Structure-of-Arrays fuer schnelles Zeichnen.
+
+    Die CollectionProperty bleibt der persistente Speicher; draw() liest nur
+    diese Arrays und vermeidet so RNA-Zugriffe pro Node und Redraw.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.types = []
+        self.levels = array('b')
+        self.expanded = array('b')
+        self.has_children = array('b')
+        # Direkte Children und exklusives Subtree-Ende je Node (siehe build_index)
+        self.children = []
+        self.subtree_end = array('i')
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name, node_type, level, has_children):
+        self.names.append(name)
+        self.types.append(node_type)
+        self.levels.append(level)
+        self.expanded.append(0)
+        self.has_children.append(1 if has_children else 0)
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """Baut die Arrays aus einer bestehenden CollectionProperty auf."""
+        tree = cls()
+        for node in nodes:
+            tree.append(node.name, node.node_type, node.level, node.has_children)
+            tree.expanded[-1] = 1 if node.expanded else 0
+        tree.build_index()
+        return tree
+
+    @classmethod
+    def from_ids_data(cls, json_data):
+        """Baut die Arrays direkt aus den geparsten IDS-Daten (ohne RNA-Zugriffe)."""
+        tree = cls()
+        append = tree.append
+        for entity_key, entity_data in json_data.items():
+            # Check if entity has properties - FIX: Explizite Boolean-Zuweisung
+            has_properties = bool(isinstance(entity_data, dict) and
+                                  "properties" in entity_data and
+                                  entity_data["properties"])
+            
+            # Add main entity node (IFC Class)
+            append(intern(entity_key), "Entity", 0, has_properties)
+            
+            # Add properties (fuer Tree-Structure)
+            if has_properties:
+                for pset_name, pset_data in entity_data["properties"].items():
+                    # PropertySet node
+                    is_dict = isinstance(pset_data, dict)
+                    append(intern(pset_name), "PropertySet", 1, is_dict and bool(pset_data))
+                    
+                    # Individual properties (haben keine Children)
+                    if is_dict:
+                        for prop_name in pset_data.keys():
+                            append(intern(prop_name), "Property", 2, False)
+        tree.build_index()
+        return tree
+
+    def write_nodes(self, nodes):
+        """Uebernimmt die Arrays in eine (leere) CollectionProperty.
+
+        Zahlen/Booleans werden per foreach_set in einem Aufruf geschrieben,
+        nur die Strings brauchen noch einen RNA-Zugriff pro Node.
+        """
+        for name, node_type in zip(self.names, self.types):
+            node = nodes.add()
+            node.name = name
+            node.node_type = node_type
+        nodes.foreach_set("level", self.levels.tolist())
+        nodes.foreach_set("expanded", self.expanded.tolist())  # Standardmaessig eingeklappt
+        nodes.foreach_set("has_children", self.has_children.tolist())
+
+    def build_index(self):
+        """Berechnet children[i] und subtree_end[i] in einem linearen Durchlauf."""
+        count = len(self.levels)
+        children = [[] for _ in range(count)]
+        subtree_end = array('i', [count]) * count
+        stack = []
+        for i, level in enumerate(self.levels):
+            # Alle offenen Nodes mit gleichem oder tieferem Level sind abgeschlossen
+            while stack and self.levels[stack[-1]] >= level:
+                subtree_end[stack.pop()] = i
+            if stack:
+                children[stack[-1]].append(i)
+            stack.append(i)
+        self.children = children
+        self.subtree_end = subtree_end
+
+# Tree-Arrays je Scene (Key: scene.as_pointer())
+_tree_cache = {}
+
+def get_tree(scene):
+    """Liefert die Tree-Arrays der Scene, baut sie bei Bedarf neu auf."""
+    key = scene.as_pointer()
+    tree = _tree_cache.get(key)
+    if tree is None or len(tree) != len(scene.simple_tree_nodes):
+        # z.B. nach dem Laden einer .blend-Datei
+        tree = TreeArrays.from_nodes(scene.simple_tree_nodes)
+        _tree_cache[key] = tree
+    return tree
+
+# Undo/Redo und das Laden einer .blend-Datei ersetzen die Nodes (auch bei gleicher Anzahl)
+_TREE_CACHE_HANDLERS = ('load_post', 'undo_post', 'redo_post')
+
+@persistent
+def _clear_tree_cache(*args):
+    _tree_cache.clear()
+
 class SimpleTreeNode(PropertyGroup):
     name: StringProperty(name="Name", default="")
     node_type: StringProperty(name="Type", default="")
@@ -208,18 +447,53 @@ class SIMPLE_OT_toggle_node(Operator):
         scene = context.scene
         
         if 0 <= self.node_index < len(scene.simple_tree_nodes):
-            node = scene.simple_tree_nodes[self.node_index]
+            tree = get_tree(scene)
             
             # Toggle expand/collapse nur fuer Nodes mit Children
-            if node.has_children:
-                node.expanded = not node.expanded
-                print(f"Toggled {node.name}: {'expanded' if node.expanded else 'collapsed'}")
+            if tree.has_children[self.node_index]:
+                expanded = not tree.expanded[self.node_index]
+                tree.expanded[self.node_index] = expanded
+                scene.simple_tree_nodes[self.node_index].expanded = expanded
+                log.debug("Toggled %s: %s", tree.names[self.node_index], 'expanded' if expanded else 'collapsed')
             
             # Immer Selection setzen
             scene.simple_selected_index = self.node_index
         
         return {'FINISHED'}
 
+class SIMPLE_OT_precompile_ids(Operator):
+    bl_idname = "simple.precompile_ids"
+    bl_label = "Precompile IDS"
+    bl_description = "Parse IDS File 1 once and store the result as <file name>.json next to it"
+    
+    def execute(self, context):
+        scene = context.scene
+        
+        if not scene.simple_file1_loaded:
+            self.report({'ERROR'}, "Please load an IDS file first")
+            return {'CANCELLED'}
+        
+        file_path = scene.simple_file1_path
+        # Gleiche Zuordnung wie Analyze, d.h. auch SPEC.IDS
+        if LOADERS.get(Path(file_path).suffix.lower()) is not load_ids_or_cache:
+            self.report({'ERROR'}, "Only .ids or .xml files can be precompiled")
+            return {'CANCELLED'}
+        
+        try:
+            # Stempel vor dem Parsen, eine Aenderung waehrenddessen macht das Sidecar ungueltig
+            source_stamp = get_source_stamp(file_path)
+            json_data = parse_ids(file_path)
+            sidecar = write_sidecar(file_path, json_data, source_stamp)
+        except ET.ParseError as e:
+            self.report({'ERROR'}, f"XML Parse Error: {str(e)}")
+            return {'CANCELLED'}
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write precompiled IDS: {str(e)}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Precompiled {len(json_data)} entities to {sidecar.name}")
+        return {'FINISHED'}
+
 class SIMPLE_OT_analyze_ids(Operator):
     bl_idname = "simple.analyze_ids"
     bl_label = "Analyze IDS"
@@ -235,19 +509,15 @@ class SIMPLE_OT_analyze_ids(Operator):
             # Parse IDS file using your parser
             file_path = scene.simple_file1_path
             
-            if file_path.endswith('.json'):
-                # Direct JSON loading
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    json_data = json.load(f)
-            elif file_path.endswith(('.ids', '.xml')):
-                # Parse IDS/XML using your parser
-                print(f"Parsing IDS file: {file_path}")
-                json_data = parse_ids(file_path)
-                print(f"Parsed {len(json_data)} entities from IDS file")
-            else:
+            loader = LOADERS.get(Path(file_path).suffix.lower())
+            if loader is None:
                 self.report({'ERROR'}, "Unsupported file format. Use .ids, .xml, or .json files")
                 return {'CANCELLED'}
             
+            # JSON direkt laden, IDS/XML parsen (oder vorkompiliertes Sidecar nutzen)
+            json_data = loader(file_path)
+            print(f"Parsed {len(json_data)} entities from IDS file")
+            
             # Clear existing tree
             scene.simple_tree_nodes.clear()
             
@@ -256,51 +526,10 @@ class SIMPLE_OT_analyze_ids(Operator):
                 return {'CANCELLED'}
             
             # Build complete tree structure from parsed IDS data
-            entity_count = 0
-            for entity_key, entity_data in json_data.items():
-                # Add main entity node (IFC Class)
-                entity_node = scene.simple_tree_nodes.add()
-                entity_node.name = entity_key
-                entity_node.node_type = "Entity"
-                entity_node.level = 0
-                entity_node.expanded = False  # Standardmaessig eingeklappt
-                entity_count += 1
-                
-                # Check if entity has properties - FIX: Explizite Boolean-Zuweisung
-                if (isinstance(entity_data, dict) and 
-                    "properties" in entity_data and 
-                    entity_data["properties"]):
-                    entity_node.has_children = True
-                    has_properties = True
-                else:
-                    entity_node.has_children = False
-                    has_properties = False
-                
-                # Add properties (fuer Tree-Structure)
-                if has_properties:
-                    for pset_name, pset_data in entity_data["properties"].items():
-                        # PropertySet node
-                        pset_node = scene.simple_tree_nodes.add()
-                        pset_node.name = pset_name
-                        pset_node.node_type = "PropertySet"
-                        pset_node.level = 1
-                        pset_node.expanded = False
-                        
-                        # FIX: Explizite Boolean-Zuweisung fuer has_children
-                        if isinstance(pset_data, dict) and pset_data:
-                            pset_node.has_children = True
-                        else:
-                            pset_node.has_children = False
-                        
-                        # Individual properties
-                        if isinstance(pset_data, dict):
-                            for prop_name in pset_data.keys():
-                                prop_node = scene.simple_tree_nodes.add()
-                                prop_node.name = prop_name
-                                prop_node.node_type = "Property"
-                                prop_node.level = 2
-                                prop_node.expanded = False
-                                prop_node.has_children = False  # Properties haben keine Children
+            tree = TreeArrays.from_ids_data(json_data)
+            entity_count = len(json_data)
+            tree.write_nodes(scene.simple_tree_nodes)
+            _tree_cache[scene.as_pointer()] = tree
             
             # Show tree
             scene.simple_show_tree = True
@@ -319,6 +548,54 @@ class SIMPLE_OT_analyze_ids(Operator):
             self.report({'ERROR'}, f"Error parsing IDS file: {str(e)}")
             return {'CANCELLED'}
 
+class SIMPLE_UL_tree(UIList):
+    """Tree-Ansicht der IDS-Nodes; eingeklappte Subtrees werden ausgefiltert."""
+    
+    NODE_ICONS = {"Entity": 'MESH_CUBE', "PropertySet": 'PROPERTIES'}
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        tree = get_tree(data)
+        row = layout.row(align=True)
+        
+        # Indentation
+        for _ in range(tree.levels[index]):
+            row.label(text="", icon='BLANK1')
+        
+        # Expand/Collapse icon fuer Nodes mit Children
+        if tree.has_children[index]:
+            icon = 'TRIA_DOWN' if tree.expanded[index] else 'TRIA_RIGHT'
+            row.operator("simple.toggle_node", text="", icon=icon, emboss=False).node_index = index
+        else:
+            row.label(text="", icon='DOT')
+        
+        row.label(text=tree.names[index], icon=self.NODE_ICONS.get(tree.types[index], 'DOT'))
+    
+    def filter_items(self, context, data, propname):
+        nodes = getattr(data, propname)
+        
+        # Namensfilter zeigt alle Treffer unabhaengig vom Expand-Status
+        if self.filter_name:
+            flags = UI_UL_list.filter_items_by_name(self.filter_name, self.bitflag_filter_item, nodes, "name")
+            return flags, []
+        
+        tree = get_tree(data)
+        expanded = tree.expanded
+        has_children = tree.has_children
+        subtree_end = tree.subtree_end
+        visible = self.bitflag_filter_item
+        flags = [0] * len(tree)
+        
+        # Expanded Nodes: weiter zum ersten Child, sonst ganzen Subtree ueberspringen
+        i = 0
+        count = len(tree)
+        while i < count:
+            flags[i] = visible
+            if expanded[i] and has_children[i]:
+                i += 1
+            else:
+                i = subtree_end[i]
+        return flags, []
+
 class SIMPLE_PT_ids_panel(Panel):
     bl_label = "IDS Match"
     bl_idname = "SIMPLE_PT_ids_panel"
@@ -353,6 +630,7 @@ class SIMPLE_PT_ids_panel(Panel):
             box.label(text="Analysis", icon='ZOOM_ALL')
             row = box.row()
             row.operator("simple.analyze_ids", text="Analyze IDS", icon='OUTLINER_OB_MESH')
+            row.operator("simple.precompile_ids", text="Precompile", icon='FILE_CACHE')
         
         # Match Section - nur wenn Tree angezeigt (IDS2 nicht mehr erforderlich)
         if getattr(scene, 'simple_show_tree', False):
@@ -383,77 +661,11 @@ class SIMPLE_PT_ids_panel(Panel):
             box.label(text=f"Tree: {filename}", icon='OUTLINER_OB_MESH')
             
             if hasattr(scene, 'simple_tree_nodes') and len(scene.simple_tree_nodes) > 0:
-                self._draw_tree_nodes(box, scene)
+                # UIList zeichnet nur die sichtbaren Zeilen
+                box.template_list("SIMPLE_UL_tree", "", scene, "simple_tree_nodes",
+                                  scene, "simple_selected_index", rows=20)
             else:
                 box.label(text="No tree data available", icon='INFO')
-    
-    def _draw_tree_nodes(self, layout, scene):
-        """Zeichnet die Tree-Nodes mit verbesserter Logik."""
-        selected_idx = getattr(scene, 'simple_selected_index', -1)
-        
-        # Zeige alle Entities (Level 0) immer
-        for i, node in enumerate(scene.simple_tree_nodes):
-            if node.level == 0:  # Entity level - immer zeigen
-                self._draw_single_node(layout, scene, node, i, selected_idx)
-                
-                # Zeige PropertySets nur wenn Entity expanded ist
-                if node.expanded and node.has_children:
-                    self._draw_children(layout, scene, i, selected_idx)
-    
-    def _draw_single_node(self, layout, scene, node, index, selected_idx):
-        """Zeichnet einen einzelnen Node."""
-        row = layout.row()
-        
-        # Indentation
-        for _ in range(node.level):
-            row.label(text="", icon='BLANK1')
-        
-        # Blaue Markierung fuer Selection
-        if index == selected_idx:
-            # Blauer Hintergrund fuer ausgewaehlten Node
-            sub = row.row()
-            sub.alert = False
-            op = sub.operator("simple.toggle_node", text=node.name, depress=True)
-            op.node_index = index
-        else:
-            # Expand/Collapse icon fuer Nodes mit Children
-            if node.has_children:
-                icon = 'TRIA_DOWN' if node.expanded else 'TRIA_RIGHT'
-                row.operator("simple.toggle_node", text="", icon=icon).node_index = index
-            else:
-                row.label(text="", icon='DOT')
-            
-            # Node icon
-            if node.node_type == "Entity":
-                icon = 'MESH_CUBE'
-            elif node.node_type == "PropertySet":
-                icon = 'PROPERTIES'
-            else:
-                icon = 'DOT'
-            
-            # Node button
-            op = row.operator("simple.toggle_node", text=node.name, icon=icon)
-            op.node_index = index
-    
-    def _draw_children(self, layout, scene, parent_index, selected_idx):
-        """Zeichnet Children-Nodes eines expanded Parents."""
-        parent_node = scene.simple_tree_nodes[parent_index]
-        
-        # Finde alle direkten Children
-        for i in range(parent_index + 1, len(scene.simple_tree_nodes)):
-            child_node = scene.simple_tree_nodes[i]
-            
-            # Stop wenn wir zu einem anderen Parent kommen
-            if child_node.level <= parent_node.level:
-                break
-            
-            # Zeige nur direkte Children (level = parent_level + 1)
-            if child_node.level == parent_node.level + 1:
-                self._draw_single_node(layout, scene, child_node, i, selected_idx)
-                
-                # Rekursiv fuer expanded PropertySets
-                if child_node.expanded and child_node.has_children:
-                    self._draw_children(layout, scene, i, selected_idx)
 
 def register():
     bpy.utils.register_class(SimpleTreeNode)
@@ -461,7 +673,9 @@ def register():
     bpy.utils.register_class(SIMPLE_OT_load_file2)
     bpy.utils.register_class(SIMPLE_OT_toggle_node)
     bpy.utils.register_class(SIMPLE_OT_analyze_ids)
+    bpy.utils.register_class(SIMPLE_OT_precompile_ids)
     bpy.utils.register_class(SIMPLE_OT_match_ids)  # Neuer Operator
+    bpy.utils.register_class(SIMPLE_UL_tree)
     bpy.utils.register_class(SIMPLE_PT_ids_panel)
     
     bpy.types.Scene.simple_file1_loaded = BoolProperty(default=False)
@@ -479,9 +693,19 @@ def register():
     bpy.types.Scene.simple_has_match_results = BoolProperty(default=False)
     bpy.types.Scene.simple_matched_entity = StringProperty(default="")
     
+    for name in _TREE_CACHE_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if _clear_tree_cache not in handlers:
+            handlers.append(_clear_tree_cache)
+    
     print("IDS Match Panel registered with Match functionality!")
 
 def unregister():
+    for name in _TREE_CACHE_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if _clear_tree_cache in handlers:
+            handlers.remove(_clear_tree_cache)
+    
     props = ['simple_file1_loaded', 'simple_file1_name', 'simple_file1_path',
              'simple_file2_loaded', 'simple_file2_name', 'simple_file2_path',
              'simple_tree_nodes', 'simple_selected_index', 'simple_show_tree',
@@ -490,13 +714,16 @@ def unregister():
         if hasattr(bpy.types.Scene, prop):
             delattr(bpy.types.Scene, prop)
     
-    classes = [SIMPLE_PT_ids_panel, SIMPLE_OT_match_ids, SIMPLE_OT_analyze_ids, SIMPLE_OT_toggle_node,
+    classes = [SIMPLE_PT_ids_panel, SIMPLE_UL_tree, SIMPLE_OT_match_ids, SIMPLE_OT_precompile_ids, SIMPLE_OT_analyze_ids, SIMPLE_OT_toggle_node,
                SIMPLE_OT_load_file2, SIMPLE_OT_load_file1, SimpleTreeNode]
     for cls in classes:
         try:
             bpy.utils.unregister_class(cls)
         except:
             pass
+    
+    _tree_cache.clear()
+    _entity_key_cache.clear()
 
 def clean():
     unregister()
@@ -9,146 +9,1168 @@ Mit integrierter IFC Property Fix Funktionalitaet.
 
 import bpy
 import json
-import ifcopenshell
+import logging
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
 from bpy.types import Operator, Panel, PropertyGroup
 from bpy.props import StringProperty, BoolProperty
 from pathlib import Path
 
+# orjson ist optional (schnellerer JSON-Parser), Fallback auf stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson ist optional (Streaming-Parser fuer grosse Patch-Konfigurationen)
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# Detail-Ausgaben pro Instanz/Property (bremst bei grossen IFC-Dateien stark)
+ENABLE_VERBOSE = False
+
+log = logging.getLogger(__name__)
+if ENABLE_VERBOSE and not log.handlers:
+    log.setLevel(logging.DEBUG)
+    log.addHandler(logging.StreamHandler())
+
+# Diagnose fuer lange Patch-Laeufe: IDS_PATCH_PROFILE=1 schreibt <output>.prof (pstats)
+# und aktiviert faulthandler fuer Abstuerze in ifcopenshell
+PROFILE_ENV = 'IDS_PATCH_PROFILE'
+if os.environ.get(PROFILE_ENV):
+    import faulthandler
+    try:
+        faulthandler.enable()
+    except (AttributeError, ValueError, OSError):
+        pass  # z.B. kein echtes stderr in Blender unter Windows
+
+
+def load_json_config(json_path):
+    """Load the IDS patch JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(Path(json_path).read_bytes())
+    with open(json_path, 'r', encoding='utf-8') as json_file:
+        return json.load(json_file)
+
+
+# Ab dieser Dateigroesse wird die Konfiguration gestreamt statt komplett geladen
+STREAM_JSON_MIN_SIZE = 1_000_000
+
+
+def _stream_json_config(json_path):
+    with open(json_path, 'rb') as json_file:
+        yield from ijson.kvitems(json_file, '', use_float=True)
+
+
+def open_json_config(json_path):
+    """Return the IDS patch config as a dict, or as a stream of (ifc_type, config) pairs for large files."""
+    if ijson is not None and os.path.getsize(json_path) >= STREAM_JSON_MIN_SIZE:
+        return _stream_json_config(json_path)
+    return load_json_config(json_path)
+
 
 # IFC Property Fix Functions (from IFC_fix_properties.py)
-def read_json_config(ifc_type, json_config):
-    if ifc_type in json_config:
-        return json_config[ifc_type]
-    return None
 
-def process_ifc_file(ifc_file, json_config):
-    """Process IFC file with JSON configuration."""
-    # Open the IFC file
-    ifc_model = ifcopenshell.open(ifc_file)
+# Marker fuer fehlende Attribute (wrappedValue kann selbst None sein)
+_MISSING = object()
 
-    # Iterate through each IFC type in the JSON config
-    for ifc_type, config in json_config.items():
-        # Check if the IFC type exists in the model
-        if ifc_model.by_type(ifc_type):
-            instances = ifc_model.by_type(ifc_type)
-            print(f"\nProcessing {len(instances)} instances of {ifc_type}")
+# Kompilierte Patcher, Key: (Pfad, mtime_ns, Groesse)
+_PATCHER_CACHE = OrderedDict()
+PATCHER_CACHE_SIZE = 8
+
+
+def _compile_pset(pset_cfg):
+    """Split a Pset config into (replace_name, {property name: (replace_name, replace_values, value_maps)}).
+
+    value_maps is filled lazily per runtime value type by _apply_property_patch.
+    """
+    properties = {}
+    for property_name, prop_cfg in pset_cfg.items():
+        if property_name == 'replace_name' or not isinstance(prop_cfg, dict):
+            continue
+        replace_name = prop_cfg.get('replace_name')
+        replace_values = prop_cfg.get('replace_values')
+        replace_values = tuple(replace_values.items()) if replace_values else None
+        # Eintraege ohne Umbenennung und ohne Werte aendern nichts
+        if replace_name is None and replace_values is None:
+            continue
+        properties[property_name] = (replace_name, replace_values, {})
+    return pset_cfg.get('replace_name'), properties
+
+
+def _compile_type_config(config):
+    return {
+        pset_name: _compile_pset(pset_cfg)
+        # Typen ohne properties_values haben nichts zu patchen
+        for pset_name, pset_cfg in config.get('properties_values', {}).items()
+    }
+
+
+def compile_patcher(json_config):
+    """Compile the IDS patch config once and return patcher(ifc_file, progress=None) -> output file.
+
+    json_config: dict or iterable of (ifc_type, config) pairs (see open_json_config).
+    Streamed configs are compiled lazily, one IFC type at a time, and can only be run once.
+    """
+    if isinstance(json_config, dict):
+        patches = [(ifc_type, _compile_type_config(config)) for ifc_type, config in json_config.items()]
+    else:
+        patches = ((ifc_type, _compile_type_config(config)) for ifc_type, config in json_config)
+
+    # Nur Umbenennungen: STEP-Text direkt patchen (nicht fuer gestreamte Configs)
+    rename_only = ENABLE_STEP_RENAME and isinstance(patches, list) and _is_rename_only(patches)
+
+    def run(ifc_file, progress=None):
+        if rename_only and _is_step_file(ifc_file):
+            try:
+                return _apply_renames_step(ifc_file, patches, progress)
+            except StepFormatError as e:
+                print(f"STEP fast path not applicable ({e}), using ifcopenshell")
+        return _apply_patches(ifc_file, patches, progress)
+
+    def patcher(ifc_file, progress=None):
+        if os.environ.get(PROFILE_ENV):
+            return _run_profiled(run, ifc_file, progress)
+        return run(ifc_file, progress)
+
+    return patcher
+
+
+def _run_profiled(run, ifc_file, progress):
+    import cProfile
+    import pstats
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        return run(ifc_file, progress)
+    finally:
+        profile.disable()
+        # Auch bei Fehlern schreiben, gerade dann wird das Profil gebraucht
+        profile_file = _fixed_path(ifc_file) + '.prof'
+        pstats.Stats(profile).sort_stats('cumulative').dump_stats(profile_file)
+        print(f"Profile written to {profile_file}")
 
-            # Print all property values for each instance
-            for instance in instances:
-                print(f"\nInstance ID: {instance.id()}")
 
-                # Check if the instance has the specified property set
-                if 'IsDefinedBy' in dir(instance):
-                    defined_by = instance.IsDefinedBy
+def _fixed_path(ifc_file):
+    """<name>_fixed<suffix> next to ifc_file, independent of the suffix case."""
+    path = Path(ifc_file)
+    return str(path.with_name(path.stem + '_fixed' + path.suffix))
 
-                    # Iterate through each property set attached to the instance
-                    for rel_defines in defined_by:
-                        if rel_defines.is_a("IfcRelDefinesByProperties"):
-                            property_set = rel_defines.RelatingPropertyDefinition
 
-                            # Get the Property Set name
-                            property_set_name = property_set.Name if 'Name' in dir(property_set) else "Unknown Property Set"
+def _output_path(ifc_file):
+    """Output path for a patch run; refuses to write over the input file."""
+    output_file = _fixed_path(ifc_file)
+    # z.B. Symlink/Hardlink: Output zeigt auf die Eingabedatei
+    if os.path.exists(output_file) and os.path.samefile(ifc_file, output_file):
+        raise ValueError(f"Output file {output_file} is the input file")
+    return output_file
+
+
+def get_patcher(json_path):
+    """Return the compiled patcher for json_path, reusing it while the file is unchanged."""
+    st = os.stat(json_path)
+    key = (json_path, st.st_mtime_ns, st.st_size)
+
+    patcher = _PATCHER_CACHE.get(key)
+    if patcher is not None:
+        _PATCHER_CACHE.move_to_end(key)
+        return patcher
+
+    json_config = open_json_config(json_path)
+    patcher = compile_patcher(json_config)
+
+    # Gestreamte Konfigurationen sind nur einmal lesbar und werden nicht gecacht
+    if isinstance(json_config, dict):
+        _PATCHER_CACHE[key] = patcher
+        if len(_PATCHER_CACHE) > PATCHER_CACHE_SIZE:
+            _PATCHER_CACHE.popitem(last=False)
+    return patcher
+
+
+def process_ifc_file(ifc_file, json_config, progress=None):
+    """Process IFC file with JSON configuration.
+
+    json_config: dict or iterable of (ifc_type, config) pairs (see open_json_config).
+    progress: optional callable receiving short status messages (e.g. from a worker thread);
+        it is called between IFC types and may raise PatchCancelled to abort the run.
+    """
+    return compile_patcher(json_config)(ifc_file, progress)
+
+
+# Ab so vielen IFC-Typen wird das Modell einmal durchlaufen statt einmal pro Typ
+SINGLE_PASS_MIN_TYPES = 8
+
+
+def _valid_patches(schema, patches):
+    """Yield (ifc_type, pset_patches) for types that exist in the schema and have psets configured."""
+    for ifc_type, pset_patches in patches:
+        # Nur IFC-Typen verarbeiten, die im Schema des Modells existieren
+        try:
+            schema.declaration_by_name(ifc_type)
+        except RuntimeError:
+            print(f"Skipping {ifc_type}: not defined in schema {schema.name()}")
+            continue
+
+        # Ohne konfigurierte Psets gibt es fuer diesen Typ nichts zu patchen
+        if not pset_patches:
+            continue
+
+        yield ifc_type, pset_patches
+
 
-                            # Check if the property set is in the JSON config
-                            if property_set_name in config['properties_values']:
-                                # Print only the properties defined in the JSON config
-                                print(f"\nProperty Set: {property_set_name}")
+def _supertype_names(schema, entity_name):
+    """Lower-case names of entity_name and all its supertypes."""
+    names = set()
+    declaration = schema.declaration_by_name(entity_name)
+    while declaration is not None:
+        names.add(declaration.name().lower())
+        declaration = declaration.supertype()
+    return names
 
-                                # check if Pset name should be replaced
-                                if config['properties_values'][property_set_name].get('replace_name') is not None:
-                                    # TODO: check if Pset with same name already exists
-                                    print(f"Replace {property_set_name} by {config['properties_values'][property_set_name]['replace_name']}")
-                                    property_set.Name = config['properties_values'][property_set_name]['replace_name']
 
-                                # Iterate through each property in the property set
-                                for property_single_value in property_set.HasProperties:
-                                    handle_property_single_value(property_single_value, config['properties_values'][property_set_name])
+def _apply_patches(ifc_file, patches, progress):
+    # Lazy import: ifcopenshell erst beim ersten Patch laden, nicht beim Addon-Start
+    import ifcopenshell
+
+    # Vor dem Laden pruefen, damit die Eingabe nie ueberschrieben wird
+    output_file = _output_path(ifc_file)
+
+    # Open the IFC file
+    ifc_model = ifcopenshell.open(ifc_file)
+
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(ifc_model.schema)
+    valid_patches = _valid_patches(schema, patches)
+
+    if isinstance(patches, list):
+        valid_patches = list(valid_patches)
+        # Psets einmal ueber alle IfcRelDefinesByProperties zuordnen statt IsDefinedBy pro Instanz
+        pset_index = _pset_index(ifc_model, valid_patches)
+        get_psets = lambda instance: pset_index.get(instance.id(), ())
+    else:
+        # Gestreamte Config: Pset-Namen sind vorab nicht bekannt
+        get_psets = _defined_psets
+
+    # Viele Typen: ein Durchlauf ueber alle Objekte statt by_type() pro Typ
+    if isinstance(patches, list) and len(patches) >= SINGLE_PASS_MIN_TYPES:
+        instance_count, pset_count = _patch_single_pass(ifc_model, schema, valid_patches, get_psets, progress)
+    else:
+        instance_count, pset_count = _patch_per_type(ifc_model, valid_patches, get_psets, progress)
+
+    print(f"Patched {pset_count} property sets on {instance_count} instances")
 
     # Save the modified IFC model to a new file
-    output_file = ifc_file.replace('.ifc', '_fixed.ifc')
+    if progress is not None:
+        progress(f"Writing {Path(output_file).name}")
     ifc_model.write(output_file)
     return output_file
 
-def handle_property_single_value(property_single_value, properties_values):
-    """Handle individual property value replacement."""
-    property_name = property_single_value.Name
-    if (properties_values.get(property_name) is not None and
-            properties_values[property_name].get('replace_name') is not None):
+
+def _pset_index(ifc_model, patches):
+    """Map instance id -> property sets whose name is configured, in relation order."""
+    pset_names = set()
+    for _, pset_patches in patches:
+        pset_names.update(pset_patches)
+
+    # Nur urspruenglich konfigurierte Namen koennen matchen (umbenannt wird erst nach einem Match)
+    index = {}
+    for rel_defines in ifc_model.by_type("IfcRelDefinesByProperties"):
+        property_set = rel_defines.RelatingPropertyDefinition
+        if getattr(property_set, "Name", None) not in pset_names:
+            continue
+        for related_object in rel_defines.RelatedObjects:
+            index.setdefault(related_object.id(), []).append(property_set)
+    return index
+
+
+def _defined_psets(instance):
+    """Property sets of an instance via its IsDefinedBy inverse attribute."""
+    # Check if the instance has the specified property set
+    defined_by = getattr(instance, "IsDefinedBy", None)
+    if not defined_by:
+        return ()
+    return [
+        rel_defines.RelatingPropertyDefinition
+        for rel_defines in defined_by
+        if rel_defines.is_a("IfcRelDefinesByProperties")
+    ]
+
+
+def _patch_per_type(ifc_model, patches, get_psets, progress):
+    # Counters for the summary output
+    instance_count = 0
+    pset_count = 0
+
+    # Iterate through each IFC type in the compiled config
+    for ifc_type, pset_patches in patches:
+        # Check if the IFC type exists in the model
+        instances = ifc_model.by_type(ifc_type)
+        if not instances:
+            continue
+
+        print(f"Processing {len(instances)} instances of {ifc_type}")
+        if progress is not None:
+            progress(f"Processing {len(instances)} instances of {ifc_type}")
+        instance_count += len(instances)
+
+        for instance in instances:
+            pset_count += _patch_instance(instance, get_psets(instance), pset_patches)
+
+    return instance_count, pset_count
+
+
+def _patch_single_pass(ifc_model, schema, patches, get_psets, progress):
+    # Konfigurierte Typen in Config-Reihenfolge, Vergleich ohne Gross-/Kleinschreibung
+    configured = [ifc_type.lower() for ifc_type, _ in patches]
+    # Exakter Entity-Typ -> Indizes der anwendbaren Konfigurationen (inkl. Supertypen)
+    applicable = {}
+    # Ein Bucket pro konfiguriertem Typ, damit die Reihenfolge wie bei _patch_per_type bleibt
+    buckets = [[] for _ in patches]
+    # Typen ausserhalb von IfcObjectDefinition liefert der Durchlauf nicht: wie im Typ-Pfad per by_type()
+    outside = [
+        index for index, (ifc_type, _) in enumerate(patches)
+        if "ifcobjectdefinition" not in _supertype_names(schema, ifc_type)
+    ]
+    for index in outside:
+        buckets[index] = ifc_model.by_type(patches[index][0])
+        configured[index] = None
+
+    instances = ifc_model.by_type("IfcObjectDefinition")
+    print(f"Processing {len(instances)} objects for {len(configured)} IFC types")
+    if progress is not None:
+        progress(f"Processing {len(instances)} objects for {len(configured)} IFC types")
+
+    for instance in instances:
+        entity = instance.is_a()
+        indices = applicable.get(entity)
+        if indices is None:
+            names = _supertype_names(schema, entity)
+            indices = applicable[entity] = tuple(
+                index for index, ifc_type in enumerate(configured) if ifc_type in names
+            )
+        for index in indices:
+            buckets[index].append(instance)
+
+    # Typ fuer Typ anwenden: verkettete Umbenennungen auf geteilten Psets greifen wie im Typ-Pfad
+    instance_count = 0
+    pset_count = 0
+    for (ifc_type, pset_patches), bucket in zip(patches, buckets):
+        if bucket and progress is not None:
+            progress(f"Processing {len(bucket)} instances of {ifc_type}")
+        instance_count += len(bucket)
+        for instance in bucket:
+            pset_count += _patch_instance(instance, get_psets(instance), pset_patches)
+
+    return instance_count, pset_count
+
+
+def _patch_instance(instance, property_sets, pset_patches):
+    """Apply the compiled pset patches to one instance; returns the number of patched psets."""
+    # instance.id() ist ein Wrapper-Aufruf, nur ausfuehren wenn DEBUG aktiv ist
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Instance ID: %s", instance.id())
+
+    pset_count = 0
+
+    # Iterate through each property set attached to the instance
+    for property_set in property_sets:
+        # Get the Property Set name
+        property_set_name = getattr(property_set, "Name", "Unknown Property Set")
+
+        # Check if the property set is in the JSON config
+        pset_patch = pset_patches.get(property_set_name)
+        if pset_patch is None:
+            continue
+
+        # Print only the properties defined in the JSON config
+        log.debug("Property Set: %s", property_set_name)
+        pset_count += 1
+
+        # check if Pset name should be replaced
+        replace_name, property_patches = pset_patch
+        if replace_name is not None:
+            # TODO: check if Pset with same name already exists
+            log.debug("Replace %s by %s", property_set_name, replace_name)
+            property_set.Name = replace_name
+
+        # Pset nur umbenennen, wenn keine Properties konfiguriert sind
+        if not property_patches:
+            continue
+
+        # Iterate through each property in the property set (handler only for configured names)
+        # IfcElementQuantity & Co. haben keine HasProperties, dort wird nur umbenannt
+        for property_single_value in getattr(property_set, "HasProperties", ()):
+            property_name = property_single_value.Name
+            prop_patch = property_patches.get(property_name)
+            if prop_patch is not None:
+                _apply_property_patch(property_single_value, property_name, prop_patch)
+
+    return pset_count
+
+
+def _apply_property_patch(property_single_value, property_name, prop_patch):
+    replace_name, replace_values, value_maps = prop_patch
+    if replace_name is not None:
         # TODO: check if Pset with same name already exists
-        print(f"Replace {property_name} by {properties_values[property_name]['replace_name']}")
-        property_single_value.Name = properties_values[property_name]['replace_name']
+        log.debug("Replace %s by %s", property_name, replace_name)
+        property_single_value.Name = replace_name
+
+    if replace_values is None or not property_single_value.is_a("IfcPropertySingleValue"):
+        return
+
+    # Check if NominalValue has a wrappedValue
+    nominal_value = property_single_value.NominalValue
+    property_value = getattr(nominal_value, "wrappedValue", _MISSING)
+    if property_value is _MISSING:
+        return
 
-    if property_single_value.is_a("IfcPropertySingleValue"):
-        # Check if NominalValue has a wrappedValue
-        if property_single_value.NominalValue is not None and 'wrappedValue' in dir(property_single_value.NominalValue):
-            property_value = property_single_value.NominalValue.wrappedValue
+    value_type = type(property_value)
 
-            # Check if the property is in the JSON config
-            if property_name in properties_values:
-                # Replace values based on the JSON config
-                if properties_values[property_name].get('replace_values') is not None:
-                    for old_value, new_value in properties_values[property_name]['replace_values'].items():
-                        # Convert the old_value to the same type as property_value
-                        old_value = type(property_value)(old_value)
+    # Alte Werte einmal pro Typ konvertieren (spaetere Eintraege gewinnen wie in der Config)
+    value_map = value_maps.get(value_type)
+    if value_map is None:
+        value_map = value_maps[value_type] = {value_type(old_value): new_value for old_value, new_value in replace_values}
 
-                        if property_value == old_value:
-                            # Print debugging information
-                            print(f"Replacing {old_value} with {new_value} for Property: {property_name}")
+    # Replace values based on the JSON config
+    new_value = value_map.get(property_value, _MISSING)
+    if new_value is not _MISSING:
+        # Print debugging information
+        log.debug("Replacing %s with %s for Property: %s", property_value, new_value, property_name)
 
-                            # Convert the new_value to the same type as property_value
-                            new_value = type(property_value)(new_value)
-                            property_single_value.NominalValue.wrappedValue = new_value
+        # Convert the new_value to the same type as property_value
+        nominal_value.wrappedValue = value_type(new_value)
+
+
+# =====================================================
+# STEP FAST PATH (nur Umbenennungen)
+# =====================================================
+
+# Reine Umbenennungs-Configs direkt im STEP-Text patchen statt per ifcopenshell.open/write
+ENABLE_STEP_RENAME = True
+
+_STEP_RECORD = re.compile(rb"\s*#(\d+)\s*=\s*([A-Za-z0-9_]+)\s*\(")
+_STEP_SCHEMA = re.compile(rb"FILE_SCHEMA\s*\(\s*\(\s*'([^']*)'")
+# Strings (inkl. '' Escapes) und /* */ Kommentare am Stueck ueberspringen, sonst nur Klammern und Kommas
+_STEP_TOKEN = re.compile(rb"'[^']*(?:''[^']*)*'|/\*.*?\*/|[(),]", re.DOTALL)
+# Record-Grenzen: ';' ausserhalb von Strings und Kommentaren
+_STEP_SPLIT = re.compile(rb"[';]|/\*")
+# Possessiv, damit ein '' am Zeilenende nicht als Stringende gilt
+_STEP_STRING = re.compile(rb"'[^']*+(?:''[^']*+)*+'")
+_STEP_REF = re.compile(rb"#(\d+)")
+# Ein Argument aus genau einem String bzw. $ / *, umgeben von Leerraum und Kommentaren
+_STEP_STRING_ARG = re.compile(rb"(?:\s|/\*.*?\*/)*('[^']*(?:''[^']*)*')(?:\s|/\*.*?\*/)*", re.DOTALL)
+_STEP_UNSET_ARG = re.compile(rb"(?:\s|/\*.*?\*/)*[$*](?:\s|/\*.*?\*/)*", re.DOTALL)
+_STEP_ESCAPE = re.compile(
+    r"\\X2\\((?:[0-9A-Fa-f]{4})+)\\X0\\|\\X4\\((?:[0-9A-Fa-f]{8})+)\\X0\\"
+    r"|\\X\\([0-9A-Fa-f]{2})|\\S\\(.)|\\\\"
+)
+
+
+class StepFormatError(ValueError):
+    """STEP text the rename fast path does not handle; the ifcopenshell path is used instead."""
+
+
+def _is_rename_only(patches):
+    """True if no property in the compiled config replaces values."""
+    return all(
+        replace_values is None
+        for _, pset_patches in patches
+        for _, property_patches in pset_patches.values()
+        for _, replace_values, _ in property_patches.values()
+    )
+
+
+def _is_step_file(ifc_file):
+    with open(ifc_file, 'rb') as f:
+        return f.read(12) == b"ISO-10303-21"
+
+
+def _step_schema(ifc_file):
+    with open(ifc_file, 'rb') as f:
+        match = _STEP_SCHEMA.search(f.read(64 * 1024))
+    if match is None:
+        raise StepFormatError(f"No FILE_SCHEMA found in {ifc_file}")
+    return match.group(1).decode('ascii')
+
+
+def _iter_step_records(step_file):
+    """Yield the raw bytes of each ';'-terminated STEP record (may span several lines).
+
+    Strings and /* */ comments are skipped when looking for the terminating ';', so
+    several records on one line are split and quotes inside comments are ignored.
+    The chunks are contiguous (their lengths add up to file offsets); a comment
+    between two records is yielded as its own chunk and never matches _STEP_RECORD.
+    """
+    buffer = b""
+    start = 0  # Beginn des aktuellen Records im buffer
+    pos = 0    # bis hierhin ist der buffer gescannt
+    for line in step_file:
+        buffer = buffer[start:] + line
+        pos -= start
+        start = 0
+        while True:
+            match = _STEP_SPLIT.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            token = match.group()
+            if token == b";":
+                pos = match.end()
+                yield buffer[start:pos]
+                start = pos
+            elif token == b"'":
+                string = _STEP_STRING.match(buffer, match.start())
+                if string is None:
+                    # String geht in der naechsten Zeile weiter
+                    pos = match.start()
+                    break
+                pos = string.end()
+            else:
+                end = buffer.find(b"*/", match.end())
+                if end == -1:
+                    pos = match.start()
+                    break
+                pos = end + 2
+                # Kommentar zwischen zwei Records: eigener Chunk
+                if not buffer[start:match.start()].strip():
+                    yield buffer[start:pos]
+                    start = pos
+    if start < len(buffer):
+        yield buffer[start:]
+
+
+def _step_arg_spans(record, start):
+    """(start, end) offsets of the top-level arguments of the record, starting after its '('."""
+    spans = []
+    depth = 0
+    arg_start = start
+    for match in _STEP_TOKEN.finditer(record, start):
+        token = match.group()
+        if token == b"(":
+            depth += 1
+        elif token == b")":
+            if depth == 0:
+                spans.append((arg_start, match.start()))
+                return spans
+            depth -= 1
+        elif token == b"," and depth == 0:
+            spans.append((arg_start, match.start()))
+            arg_start = match.end()
+    raise StepFormatError(f"Unterminated STEP record: {record[:80]!r}")
+
+
+def _decode_step_string(arg):
+    """Decode a STEP string argument, or None for $ / * and anything that is not exactly one string."""
+    match = _STEP_STRING_ARG.fullmatch(arg)
+    if match is None:
+        return None
+    arg = match.group(1)
+    try:
+        text = arg[1:-1].decode('utf-8')
+    except UnicodeDecodeError:
+        text = arg[1:-1].decode('latin-1')
+    text = text.replace("''", "'")
+
+    def unescape(match):
+        if match.group(1):
+            hexes = match.group(1)
+            return "".join(chr(int(hexes[i:i + 4], 16)) for i in range(0, len(hexes), 4))
+        if match.group(2):
+            hexes = match.group(2)
+            return "".join(chr(int(hexes[i:i + 8], 16)) for i in range(0, len(hexes), 8))
+        if match.group(3):
+            return chr(int(match.group(3), 16))
+        if match.group(4):
+            return chr(ord(match.group(4)) + 128)
+        return "\\"
+
+    return _STEP_ESCAPE.sub(unescape, text)
+
+
+def _step_name(arg):
+    """Name attribute of a record: decoded string, None for $ / *, StepFormatError otherwise."""
+    name = _decode_step_string(arg)
+    if name is None and _STEP_UNSET_ARG.fullmatch(arg) is None:
+        raise StepFormatError(f"Unexpected STEP name argument: {arg[:80]!r}")
+    return name
+
+
+def _encode_step_string(text):
+    """Encode text as a STEP string argument (ASCII with \\X2\\ / \\X4\\ escapes)."""
+    out = []
+    for char in text:
+        code = ord(char)
+        if char == "'":
+            out.append("''")
+        elif char == "\\":
+            out.append("\\\\")
+        elif 32 <= code < 127:
+            out.append(char)
+        elif code <= 0xFFFF:
+            out.append(f"\\X2\\{code:04X}\\X0\\")
+        else:
+            out.append(f"\\X4\\{code:08X}\\X0\\")
+    return ("'" + "".join(out) + "'").encode('ascii')
+
+
+def _subtype_names(schema, entity_name):
+    """Upper-case STEP names (bytes) of entity_name and all its subtypes."""
+    names = set()
+    stack = [schema.declaration_by_name(entity_name)]
+    while stack:
+        declaration = stack.pop()
+        names.add(declaration.name().upper().encode('ascii'))
+        stack.extend(declaration.subtypes())
+    return names
+
+
+def _scan_step(ifc_file, object_types, pset_types, property_types, pset_names, property_names):
+    """Collect the configured objects, their pset relations, and psets/properties with configured names.
+
+    pset_types: all IfcPropertySetDefinition subtypes (z.B. auch IfcElementQuantity), wie im ifcopenshell-Pfad.
+    """
+    objects = {}    # id -> STEP entity name
+    rels = []       # (related ids, pset id) in file order
+    psets = {}      # id -> [name, property ids]
+    properties = {} # id -> name
+    name_spans = {} # pset/property id -> (start, end) des Name-Arguments in der Datei
+
+    offset = 0
+    with open(ifc_file, 'rb') as f:
+        for record in _iter_step_records(f):
+            record_offset = offset
+            offset += len(record)
+            match = _STEP_RECORD.match(record)
+            if match is None:
+                continue
+            entity = match.group(2).upper()
+            if entity in object_types:
+                objects[int(match.group(1))] = entity
+            elif entity == b"IFCRELDEFINESBYPROPERTIES":
+                spans = _step_arg_spans(record, match.end())
+                # IFC4 erlaubt auch eine Liste von Psets - die matcht auch im ifcopenshell-Pfad nie
+                relating = record[spans[5][0]:spans[5][1]].strip()
+                if relating.startswith(b"#"):
+                    related = [int(ref) for ref in _STEP_REF.findall(record, *spans[4])]
+                    rels.append((related, int(relating[1:])))
+            elif entity in pset_types:
+                spans = _step_arg_spans(record, match.end())
+                # Name ist bei allen Subtypen das dritte Argument (IfcRoot)
+                name = _step_name(record[spans[2][0]:spans[2][1]])
+                if name in pset_names:
+                    # Properties (HasProperties) gibt es nur bei IfcPropertySet
+                    property_ids = (
+                        [int(ref) for ref in _STEP_REF.findall(record, *spans[4])]
+                        if entity == b"IFCPROPERTYSET" else []
+                    )
+                    pset_id = int(match.group(1))
+                    psets[pset_id] = [name, property_ids]
+                    name_spans[pset_id] = (record_offset + spans[2][0], record_offset + spans[2][1])
+            elif entity in property_types:
+                spans = _step_arg_spans(record, match.end())
+                name = _step_name(record[spans[0][0]:spans[0][1]])
+                if name in property_names:
+                    property_id = int(match.group(1))
+                    properties[property_id] = name
+                    name_spans[property_id] = (record_offset + spans[0][0], record_offset + spans[0][1])
+
+    return objects, rels, psets, properties, name_spans
+
+
+def _apply_renames_step(ifc_file, patches, progress):
+    """Rename-only variant of _apply_patches working directly on the STEP text.
+
+    Follows the same order as the ifcopenshell path (config order, instances by id,
+    relations in file order), so chained renames resolve identically.
+    """
+    # Lazy import: nur das Schema wird gebraucht, die Datei wird nicht geoeffnet
+    import ifcopenshell
+
+    # Vor dem Scan pruefen, damit die Eingabe nie ueberschrieben wird
+    output_file = _output_path(ifc_file)
+
+    schema_name = _step_schema(ifc_file)
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_name)
+    valid_patches = [
+        (ifc_type, _subtype_names(schema, ifc_type), pset_patches)
+        for ifc_type, pset_patches in _valid_patches(schema, patches)
+    ]
+
+    object_types = set()
+    pset_names = set()
+    property_names = set()
+    for _, type_names, pset_patches in valid_patches:
+        object_types |= type_names
+        pset_names.update(pset_patches)
+        for _, property_patches in pset_patches.values():
+            property_names.update(property_patches)
+
+    if progress is not None:
+        progress(f"Scanning {Path(ifc_file).name}")
+    objects, rels, psets, properties, name_spans = _scan_step(
+        ifc_file,
+        object_types,
+        _subtype_names(schema, "IfcPropertySetDefinition"),
+        _subtype_names(schema, "IfcProperty"),
+        pset_names,
+        property_names,
+    )
+
+    # Inverse IsDefinedBy fuer die konfigurierten Objekte
+    defined_by = {}
+    for related, pset_id in rels:
+        for object_id in related:
+            if object_id in objects:
+                defined_by.setdefault(object_id, []).append(pset_id)
+
+    original_pset_names = {pset_id: pset[0] for pset_id, pset in psets.items()}
+    original_property_names = dict(properties)
+
+    # Counters for the summary output
+    instance_count = 0
+    pset_count = 0
+
+    for ifc_type, type_names, pset_patches in valid_patches:
+        instances = sorted(object_id for object_id, entity in objects.items() if entity in type_names)
+        if not instances:
+            continue
+
+        print(f"Processing {len(instances)} instances of {ifc_type}")
+        if progress is not None:
+            progress(f"Processing {len(instances)} instances of {ifc_type}")
+        instance_count += len(instances)
+
+        for object_id in instances:
+            for pset_id in defined_by.get(object_id, ()):
+                pset = psets.get(pset_id)
+                if pset is None:
+                    continue
+                pset_patch = pset_patches.get(pset[0])
+                if pset_patch is None:
+                    continue
+                pset_count += 1
+
+                replace_name, property_patches = pset_patch
+                if replace_name is not None:
+                    pset[0] = replace_name
+
+                for property_id in pset[1]:
+                    prop_patch = property_patches.get(properties.get(property_id))
+                    if prop_patch is not None and prop_patch[0] is not None:
+                        properties[property_id] = prop_patch[0]
+
+    print(f"Patched {pset_count} property sets on {instance_count} instances")
+
+    # Nur tatsaechlich geaenderte Namen umschreiben: id -> (Argument-Index, neuer Name)
+    edits = {
+        pset_id: (2, pset[0])
+        for pset_id, pset in psets.items()
+        if pset[0] != original_pset_names[pset_id]
+    }
+    edits.update(
+        (property_id, (0, name))
+        for property_id, name in properties.items()
+        if name != original_property_names[property_id]
+    )
+
+    if progress is not None:
+        progress(f"Writing {Path(output_file).name}")
+
+    # Passen alle neuen Namen in die alten Argumente, Datei kopieren und nur diese Stellen ueberschreiben
+    encoded = {record_id: _encode_step_string(name) for record_id, (_, name) in edits.items()}
+    if all(len(name) <= name_spans[record_id][1] - name_spans[record_id][0] for record_id, name in encoded.items()):
+        # Read-only Ausgabe eines frueheren Laufs ersetzen statt daran zu scheitern
+        if os.path.exists(output_file) and not os.access(output_file, os.W_OK):
+            os.chmod(output_file, os.stat(output_file).st_mode | stat.S_IWUSR)
+        _fast_copy(ifc_file, output_file, metadata=False)
+        with open(output_file, 'r+b') as f:
+            for record_id in sorted(encoded, key=name_spans.get):
+                start, end = name_spans[record_id]
+                f.seek(start)
+                # Leerzeichen zwischen Tokens sind in SPF erlaubt
+                f.write(encoded[record_id].ljust(end - start))
+        return output_file
+
+    with open(ifc_file, 'rb') as fsrc, open(output_file, 'wb', buffering=1 << 20) as fdst:
+        for record in _iter_step_records(fsrc):
+            if edits:
+                match = _STEP_RECORD.match(record)
+                edit = match and edits.get(int(match.group(1)))
+                if edit:
+                    index, name = edit
+                    start, end = _step_arg_spans(record, match.end())[index]
+                    record = record[:start] + encoded[int(match.group(1))] + record[end:]
+            fdst.write(record)
+    return output_file
+
+
+# =====================================================
+# FILE HELPERS
+# =====================================================
+
+# Puffergroesse fuer die Fallback-Kopie (an Dateigroesse angepasst)
+MIN_COPY_BUFFER_SIZE = 256 * 1024
+MAX_COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def _copy_file_range(src, dst):
+    """Copy via copy_file_range (Linux): Kernel-Kopie, Reflink/Server-side Copy wo moeglich."""
+    src_fd = os.open(src, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            size = os.fstat(src_fd).st_size
+            copied = 0
+            while copied < size:
+                # 0 heisst nicht immer EOF (z.B. Kernel 5.3-5.18 ueber Dateisystemgrenzen, FUSE)
+                n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    if copied < size:
+        raise OSError(f"copy_file_range copied {copied} of {size} bytes")
+
+
+def _copy_sendfile(src, dst):
+    """Copy via sendfile (Linux): Kernel-Kopie ohne Userspace-Puffer."""
+    src_fd = os.open(src, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            size = os.fstat(src_fd).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    if offset < size:
+        raise OSError(f"sendfile copied {offset} of {size} bytes")
+
+
+def _copy_file_win32(src, dst):
+    """Copy via CopyFileExW (Windows). Returns False if the API call failed."""
+    import ctypes
+    return bool(ctypes.windll.kernel32.CopyFileExW(str(src), str(dst), None, None, None, 0))
+
+
+def _copy_readinto(src, dst):
+    """Fallback copy loop reusing one buffer instead of allocating bytes per chunk."""
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        buf = bytearray(min(max(size, MIN_COPY_BUFFER_SIZE), MAX_COPY_BUFFER_SIZE))
+        view = memoryview(buf)
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            # FileIO.write kann weniger als n Bytes schreiben
+            written = 0
+            while written < n:
+                written += fdst.write(view[written:n])
+
+
+def _fast_copy(src, dst, metadata=True):
+    """Copy src to dst with the fastest platform mechanism.
+
+    metadata=True keeps mode and timestamps like shutil.copy2; with False dst stays
+    writable like after shutil.copyfile (e.g. for a read-only input that gets patched).
+    """
+    copied = False
+    if sys.platform == "win32":
+        copied = _copy_file_win32(src, dst)
+    elif sys.platform == "darwin":
+        # shutil.copyfile nutzt auf macOS bereits fcopyfile
+        shutil.copyfile(src, dst)
+        copied = True
+    else:
+        if hasattr(os, "copy_file_range"):
+            try:
+                _copy_file_range(src, dst)
+                copied = True
+            except OSError:
+                pass  # z.B. Dateisystem ohne Unterstuetzung - sendfile versuchen
+        if not copied and sys.platform.startswith("linux"):
+            try:
+                _copy_sendfile(src, dst)
+                copied = True
+            except OSError:
+                pass  # Fallback unten
+
+    if not copied:
+        _copy_readinto(src, dst)
+
+    if metadata:
+        shutil.copystat(src, dst)
+    elif not os.access(dst, os.W_OK):
+        # CopyFileExW uebernimmt das Read-only-Attribut
+        os.chmod(dst, os.stat(dst).st_mode | stat.S_IWUSR)
+
+
+def _move_or_copy(src, dst):
+    """Move src to dst with os.replace if both are on the same filesystem, else copy.
+
+    Returns True if the file was moved (src no longer exists).
+    """
+    dst_dir = Path(dst).resolve().parent
+    if os.stat(src).st_dev == os.stat(dst_dir).st_dev:
+        # Umbenennen ist nur eine Metadaten-Operation, keine Byte-Kopie
+        os.replace(src, dst)
+        return True
+    _fast_copy(src, dst)
+    return False
 
 
 # =====================================================
 # OPERATORS
 # =====================================================
 
+def _redraw_panel(context):
+    """Redraw the Properties editor that shows the IDS PATCH panel."""
+    window = context.window
+    if window is None:
+        return  # z.B. im Hintergrundmodus
+    for area in window.screen.areas:
+        if area.type == 'PROPERTIES':
+            area.tag_redraw()
+
+
+# Ergebnisse frueherer Patch-Laeufe: (IFC-Key, Config-Key) -> (Output-Pfad, Output-Key)
+_PATCH_RESULTS = {}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _cached_output(run_key):
+    """Output file of an earlier run with identical inputs, if it is still unchanged on disk."""
+    entry = _PATCH_RESULTS.get(run_key)
+    if entry is None:
+        return None
+    output_file, output_key = entry
+    try:
+        if _stat_key(output_file) == output_key:
+            return output_file
+    except OSError:
+        pass  # Output wurde verschoben oder geloescht
+    del _PATCH_RESULTS[run_key]
+    return None
+
+
+class PatchCancelled(Exception):
+    """Raised from the progress callback of a patch run that was cancelled."""
+
+
+# Patch-Laeufe nacheinander, damit nie zwei Worker dasselbe _fixed.ifc schreiben
+_WORKER_LOCK = threading.Lock()
+# Cancel-Events laufender Worker, unregister() bricht sie ab
+_ACTIVE_RUNS = set()
+
+
+def _start_patch_worker(patcher, ifc_path, progress, cancel_event):
+    """Run patcher in a daemon thread (blocks neither the UI nor quitting Blender); returns a Future."""
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            with _WORKER_LOCK:
+                if cancel_event.is_set():
+                    raise PatchCancelled()
+                output_file = patcher(ifc_path, progress=progress)
+                # Nach dem letzten Check abgebrochen: fertige Ausgabe nicht liegen lassen
+                if cancel_event.is_set():
+                    try:
+                        os.remove(output_file)
+                    except OSError:
+                        pass
+                    raise PatchCancelled()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(output_file)
+        finally:
+            _ACTIVE_RUNS.discard(cancel_event)
+
+    _ACTIVE_RUNS.add(cancel_event)
+    threading.Thread(target=run, name="ids_patch", daemon=True).start()
+    return future
+
+
 class IDS_PATCH_OT_patch_ifc(Operator):
     """Patch IFC file with IDS requirements."""
     bl_idname = "ids_patch.patch_ifc"
     bl_label = "Patch IFC"
     bl_description = "Apply IDS match configuration to the loaded IFC file"
     
-    def execute(self, context):
+    _future = None
+    _timer = None
+    _progress = None
+    _cancel = None
+    _run_key = None
+    
+    def _get_inputs(self, context):
+        """Check the loaded files and return (ifc_path, patcher), or None after reporting."""
         scene = context.scene
         
         # Check if both files are loaded
         if not getattr(scene, 'ids_patch_ifc_file_loaded', False):
             self.report({'ERROR'}, "Please load an IFC file first")
-            return {'CANCELLED'}
+            return None
         
         if not getattr(scene, 'ids_patch_ids_file_loaded', False):
             self.report({'ERROR'}, "Please load an IDS match configuration first")
-            return {'CANCELLED'}
+            return None
         
         # Get file paths
         ifc_path = getattr(scene, 'ids_patch_ifc_file_path', '')
         ids_path = getattr(scene, 'ids_patch_ids_file_path', '')
         
         try:
-            # Load JSON configuration
-            with open(ids_path, 'r', encoding='utf-8') as json_file:
-                json_config = json.load(json_file)
-            
-            print(f"Loaded JSON config: {json_config}")
-            print(f"Patching IFC: {ifc_path}")
-            print(f"With IDS patch configuration: {ids_path}")
-            
-            # Process IFC file with JSON config
-            output_file = process_ifc_file(ifc_path, json_config)
-            
-            # Store output file path for download
-            scene.ids_patch_output_file = output_file
-            scene.ids_patch_has_output = True
-            
-            self.report({'INFO'}, f"IFC patching completed! Output: {Path(output_file).name}")
-            return {'FINISHED'}
-            
+            # Load and compile the JSON configuration (cached while unchanged, streamed when large)
+            patcher = get_patcher(ids_path)
+            # mtime + Groesse statt Hash, um grosse IFC-Dateien nicht lesen zu muessen
+            self._run_key = (_stat_key(ifc_path), _stat_key(ids_path))
         except Exception as e:
             self.report({'ERROR'}, f"Patching failed: {str(e)}")
+            return None
+        
+        print(f"Patching IFC: {ifc_path}")
+        print(f"With IDS patch configuration: {ids_path}")
+        return ifc_path, patcher
+    
+    def _finish(self, context, output_file):
+        _PATCH_RESULTS[self._run_key] = (output_file, _stat_key(output_file))
+        
+        # Store output file path for download
+        scene = context.scene
+        scene.ids_patch_output_file = output_file
+        scene.ids_patch_has_output = True
+        
+        self.report({'INFO'}, f"IFC patching completed! Output: {Path(output_file).name}")
+        return {'FINISHED'}
+    
+    def execute(self, context):
+        # Synchroner Lauf, z.B. bei Aufruf aus einem Script
+        inputs = self._get_inputs(context)
+        if inputs is None:
             return {'CANCELLED'}
-
+        
+        ifc_path, patcher = inputs
+        output_file = _cached_output(self._run_key)
+        if output_file is not None:
+            print(f"Inputs unchanged, reusing {output_file}")
+            return self._finish(context, output_file)
+        
+        try:
+            # Process IFC file with the compiled JSON config
+            output_file = patcher(ifc_path)
+        except Exception as e:
+            self.report({'ERROR'}, f"Patching failed: {str(e)}")
+            return {'CANCELLED'}
+        
+        return self._finish(context, output_file)
+    
+    def invoke(self, context, event):
+        # Button-Klick: Patch im Worker-Thread, Fortschritt ueber Timer abfragen
+        inputs = self._get_inputs(context)
+        if inputs is None:
+            return {'CANCELLED'}
+        
+        ifc_path, patcher = inputs
+        output_file = _cached_output(self._run_key)
+        if output_file is not None:
+            print(f"Inputs unchanged, reusing {output_file}")
+            return self._finish(context, output_file)
+        
+        self._progress = progress = queue.Queue()
+        self._cancel = cancel_event = threading.Event()
+        
+        def report_progress(message):
+            # Laeuft im Worker-Thread (ohne self, der Operator kann schon beendet sein)
+            if cancel_event.is_set():
+                raise PatchCancelled()
+            progress.put(message)
+        
+        self._future = _start_patch_worker(patcher, ifc_path, report_progress, cancel_event)
+        
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+        context.scene.ids_patch_progress = "Starting..."
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            # Ein fertiges Ergebnis nicht mehr verwerfen, sondern unten uebernehmen
+            if not self._future.done():
+                self.cancel(context)
+                self.report({'WARNING'}, "Patching cancelled")
+                return {'CANCELLED'}
+        elif event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        # Neueste Fortschrittsmeldung uebernehmen (RNA nur im Main-Thread schreiben)
+        message = None
+        while True:
+            try:
+                message = self._progress.get_nowait()
+            except queue.Empty:
+                break
+        if message is not None:
+            context.scene.ids_patch_progress = message
+            _redraw_panel(context)
+        
+        if not self._future.done():
+            return {'PASS_THROUGH'}
+        
+        self._cleanup(context)
+        try:
+            output_file = self._future.result()
+        except PatchCancelled:
+            self.report({'WARNING'}, "Patching cancelled")
+            return {'CANCELLED'}
+        except Exception as e:
+            self.report({'ERROR'}, f"Patching failed: {str(e)}")
+            return {'CANCELLED'}
+        
+        return self._finish(context, output_file)
+    
+    def cancel(self, context):
+        # Der Worker bricht beim naechsten Fortschritts-Check ab und loescht eine schon geschriebene Ausgabe
+        self._cancel.set()
+        self._cleanup(context)
+    
+    def _cleanup(self, context):
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        context.scene.ids_patch_progress = ""
+        _redraw_panel(context)
+    
 
 class IDS_PATCH_OT_save_fixed_ifc(Operator):
     """Save the fixed IFC file to a selected location."""
@@ -170,9 +1192,14 @@ class IDS_PATCH_OT_save_fixed_ifc(Operator):
             return {'CANCELLED'}
         
         try:
-            # Copy file to selected location
-            import shutil
-            shutil.copy2(output_file, self.filepath)
+            if os.path.exists(self.filepath) and os.path.samefile(output_file, self.filepath):
+                pass  # Bereits an diesem Ort gespeichert, Kopie auf sich selbst wuerde die Datei leeren
+            elif output_file != _fixed_path(getattr(scene, 'ids_patch_ifc_file_path', '')):
+                # Output wurde schon verschoben: die zuletzt gespeicherte Datei bleibt erhalten
+                _fast_copy(output_file, self.filepath)
+            elif _move_or_copy(output_file, self.filepath):
+                # Nur das _fixed.ifc des Patch-Laufs verschieben, weiteres Speichern kopiert von dort
+                scene.ids_patch_output_file = self.filepath
             
             # Update scene with saved file location
             scene.ids_patch_saved_file_path = self.filepath
@@ -217,9 +1244,6 @@ class IDS_PATCH_OT_open_saved_file(Operator):
             return {'CANCELLED'}
         
         try:
-            import subprocess
-            import sys
-            
             # Open file location based on OS
             file_path = Path(saved_path)
             if sys.platform == "win32":
@@ -252,6 +1276,7 @@ class IDS_PATCH_OT_load_ifc_file(Operator):
         
         scene = context.scene
         scene.ids_patch_ifc_file_path = self.filepath
+        scene.ids_patch_ifc_file_display = _short_name(self.filepath)
         scene.ids_patch_ifc_file_loaded = True
         
         filename = Path(self.filepath).name
@@ -279,6 +1304,7 @@ class IDS_PATCH_OT_load_ids_file(Operator):
         
         scene = context.scene
         scene.ids_patch_ids_file_path = self.filepath
+        scene.ids_patch_ids_file_display = _short_name(self.filepath)
         scene.ids_patch_ids_file_loaded = True
         
         filename = Path(self.filepath).name
@@ -294,6 +1320,13 @@ class IDS_PATCH_OT_load_ids_file(Operator):
 # PANELS
 # =====================================================
 
+@lru_cache(maxsize=16)
+def _short_name(path, limit=30):
+    """File name of path, truncated to limit characters for the panel (cached across redraws)."""
+    filename = Path(path).name
+    return filename[:limit] + "..." if len(filename) > limit else filename
+
+
 class IDS_PATCH_PT_panel(Panel):
     """IDS PATCH panel in Collaboration."""
     bl_label = "IDS Patch"
@@ -308,6 +1341,12 @@ class IDS_PATCH_PT_panel(Panel):
         layout = self.layout
         scene = context.scene
         
+        # Scene-Properties einmal pro Draw lesen
+        ifc_loaded = getattr(scene, 'ids_patch_ifc_file_loaded', False)
+        ids_loaded = getattr(scene, 'ids_patch_ids_file_loaded', False)
+        has_output = getattr(scene, 'ids_patch_has_output', False)
+        file_saved = getattr(scene, 'ids_patch_file_saved', False)
+        
         # File loading interface - analog zu IFC Tester
         col = layout.column(align=True)
         
@@ -318,9 +1357,10 @@ class IDS_PATCH_PT_panel(Panel):
         # File path field (read-only display)
         sub = row.row(align=True)
         sub.scale_x = 2.0
-        if getattr(scene, 'ids_patch_ifc_file_loaded', False):
-            filename = Path(getattr(scene, 'ids_patch_ifc_file_path', '')).name
-            sub.label(text=filename[:30] + "..." if len(filename) > 30 else filename)
+        if ifc_loaded:
+            # Anzeigename wird beim Laden berechnet
+            sub.label(text=getattr(scene, 'ids_patch_ifc_file_display', '')
+                      or _short_name(getattr(scene, 'ids_patch_ifc_file_path', '')))
         else:
             sub.label(text="No IFC file loaded")
         
@@ -334,9 +1374,9 @@ class IDS_PATCH_PT_panel(Panel):
         # File path field (read-only display)
         sub = row.row(align=True)
         sub.scale_x = 2.0
-        if getattr(scene, 'ids_patch_ids_file_loaded', False):
-            filename = Path(getattr(scene, 'ids_patch_ids_file_path', '')).name
-            sub.label(text=filename[:30] + "..." if len(filename) > 30 else filename)
+        if ids_loaded:
+            sub.label(text=getattr(scene, 'ids_patch_ids_file_display', '')
+                      or _short_name(getattr(scene, 'ids_patch_ids_file_path', '')))
         else:
             sub.label(text="No IDS match file loaded")
         
@@ -344,8 +1384,7 @@ class IDS_PATCH_PT_panel(Panel):
         row.operator("ids_patch.load_ids_file", text="", icon='FILEBROWSER')
         
         # Patch IFC Button - nur wenn beide Files geladen sind
-        if (getattr(scene, 'ids_patch_ifc_file_loaded', False) and 
-            getattr(scene, 'ids_patch_ids_file_loaded', False)):
+        if ifc_loaded and ids_loaded:
             
             # Separator
             col.separator()
@@ -354,9 +1393,14 @@ class IDS_PATCH_PT_panel(Panel):
             patch_row = col.row(align=True)
             patch_row.scale_y = 1.5  # Groesserer Button
             patch_row.operator("ids_patch.patch_ifc", text="Patch IFC", icon='MODIFIER')
+            
+            # Fortschritt eines laufenden Patches
+            progress = getattr(scene, 'ids_patch_progress', '')
+            if progress:
+                col.label(text=progress, icon='TIME')
         
         # Save & Open Buttons - nur wenn Output verfuegbar ist
-        if getattr(scene, 'ids_patch_has_output', False):
+        if has_output:
             # Separator
             col.separator()
             
@@ -366,7 +1410,7 @@ class IDS_PATCH_PT_panel(Panel):
             save_row.operator("ids_patch.save_fixed_ifc", text="Save Fixed IFC", icon='FILE_TICK')
             
             # If file has been saved, show open location button
-            if getattr(scene, 'ids_patch_file_saved', False):
+            if file_saved:
                 save_row.operator("ids_patch.open_saved_file", text="", icon='FOLDER_REDIRECT')
                 
                 # Show saved file info
@@ -374,23 +1418,27 @@ class IDS_PATCH_PT_panel(Panel):
                 if saved_path:
                     info_row = col.row()
                     info_row.scale_y = 0.8
-                    saved_filename = Path(saved_path).name
-                    info_row.label(text=f"Saved: {saved_filename[:25]}..." if len(saved_filename) > 25 else f"Saved: {saved_filename}", 
-                                 icon='CHECKMARK')
+                    info_row.label(text=f"Saved: {_short_name(saved_path, 25)}", icon='CHECKMARK')
 
 
 # =====================================================
 # REGISTRATION
 # =====================================================
 
+classes = [
+    IDS_PATCH_OT_load_ifc_file,
+    IDS_PATCH_OT_load_ids_file,
+    IDS_PATCH_OT_patch_ifc,
+    IDS_PATCH_OT_save_fixed_ifc,
+    IDS_PATCH_OT_open_saved_file,
+    IDS_PATCH_PT_panel,
+]
+
+
 def register():
     """Register IDS PATCH panel."""
-    bpy.utils.register_class(IDS_PATCH_OT_load_ifc_file)
-    bpy.utils.register_class(IDS_PATCH_OT_load_ids_file)
-    bpy.utils.register_class(IDS_PATCH_OT_patch_ifc)
-    bpy.utils.register_class(IDS_PATCH_OT_save_fixed_ifc)
-    bpy.utils.register_class(IDS_PATCH_OT_open_saved_file)
-    bpy.utils.register_class(IDS_PATCH_PT_panel)
+    for cls in classes:
+        bpy.utils.register_class(cls)
     
     # Properties for file paths
     bpy.types.Scene.ids_patch_ifc_file_path = StringProperty(
@@ -398,6 +1446,11 @@ def register():
         description="Path to the loaded IFC file",
         default=""
     )
+    bpy.types.Scene.ids_patch_ifc_file_display = StringProperty(
+        name="IFC File Display Name",
+        description="Shortened file name shown in the panel",
+        default=""
+    )
     bpy.types.Scene.ids_patch_ifc_file_loaded = BoolProperty(
         name="IFC File Loaded",
         description="Whether an IFC file is loaded",
@@ -408,6 +1461,11 @@ def register():
         description="Path to the loaded IDS patch file",
         default=""
     )
+    bpy.types.Scene.ids_patch_ids_file_display = StringProperty(
+        name="IDS Patch File Display Name",
+        description="Shortened file name shown in the panel",
+        default=""
+    )
     bpy.types.Scene.ids_patch_ids_file_loaded = BoolProperty(
         name="IDS Patch File Loaded",
         description="Whether an IDS patch file is loaded", 
@@ -426,6 +1484,13 @@ def register():
         default=False
     )
     
+    # Progress of a running patch (set by the modal operator)
+    bpy.types.Scene.ids_patch_progress = StringProperty(
+        name="Patch Progress",
+        description="Status message of the running IFC patch",
+        default=""
+    )
+    
     # Saved file tracking  
     bpy.types.Scene.ids_patch_saved_file_path = StringProperty(
         name="Saved File Path",
@@ -446,11 +1511,14 @@ def unregister():
     # Remove properties
     props = [
         'ids_patch_ifc_file_path',
+        'ids_patch_ifc_file_display',
         'ids_patch_ifc_file_loaded', 
         'ids_patch_ids_file_path',
+        'ids_patch_ids_file_display',
         'ids_patch_ids_file_loaded',
         'ids_patch_output_file',
         'ids_patch_has_output',
+        'ids_patch_progress',
         'ids_patch_saved_file_path',
         'ids_patch_file_saved'
     ]
@@ -460,21 +1528,20 @@ def unregister():
             delattr(bpy.types.Scene, prop)
     
     # Unregister classes in reverse order
-    classes = [
-        IDS_PATCH_PT_panel,
-        IDS_PATCH_OT_open_saved_file,
-        IDS_PATCH_OT_save_fixed_ifc,
-        IDS_PATCH_OT_patch_ifc,
-        IDS_PATCH_OT_load_ids_file,
-        IDS_PATCH_OT_load_ifc_file
-    ]
-    
-    for cls in classes:
+    for cls in reversed(classes):
         try:
             bpy.utils.unregister_class(cls)
         except:
             pass
     
+    _PATCHER_CACHE.clear()
+    _PATCH_RESULTS.clear()
+    _short_name.cache_clear()
+    
+    # Laufende Patches beim naechsten Fortschritts-Check abbrechen
+    for cancel_event in list(_ACTIVE_RUNS):
+        cancel_event.set()
+    
     print("IDS PATCH Panel unregistered!")
 
 
@@ -0,0 +1,69 @@
+"""
+Tests for the precompiled IDS sidecar (<name>.ids.json) of ids_match_panel.
+
+Needs bpy (Blender's Python or fake-bpy-module) to import the panel module.
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Scripts"))
+import ids_match_panel  # noqa: E402
+
+EXAMPLE_IDS = Path(__file__).resolve().parent.parent / "Scripts" / "IFC_Example" / "IDS-Planer.ids"
+
+
+@pytest.fixture
+def ids_file(tmp_path):
+    path = tmp_path / "model.ids"
+    shutil.copyfile(EXAMPLE_IDS, path)
+    return path
+
+
+def _precompile(ids_file, json_data=None):
+    source_stamp = ids_match_panel.get_source_stamp(ids_file)
+    if json_data is None:
+        json_data = ids_match_panel.parse_ids(ids_file)
+    return ids_match_panel.write_sidecar(ids_file, json_data, source_stamp)
+
+
+def test_json_loader_unwraps_sidecar(ids_file):
+    sidecar = _precompile(ids_file)
+    assert sidecar.name == "model.ids.json"
+
+    data = ids_match_panel.LOADERS['.json'](sidecar)
+    assert data == ids_match_panel.parse_ids(ids_file)
+    assert not {"format", "source", "data"} & set(data)
+
+
+def test_json_loader_keeps_plain_json(tmp_path):
+    path = tmp_path / "plain.json"
+    path.write_text('{"IFCWALL": {"name": "Walls", "properties": {}}}', encoding="utf-8")
+    assert ids_match_panel.LOADERS['.json'](path) == {"IFCWALL": {"name": "Walls", "properties": {}}}
+
+
+def test_fresh_sidecar_is_used(ids_file):
+    _precompile(ids_file, {"IFCWALL": {"name": "cached", "properties": {}}})
+    assert ids_match_panel.load_ids_or_cache(ids_file) == {"IFCWALL": {"name": "cached", "properties": {}}}
+
+
+def test_sidecar_of_changed_source_is_ignored(ids_file):
+    _precompile(ids_file, {"IFCWALL": {"name": "cached", "properties": {}}})
+    # Aenderung mit aelterer mtime, wie nach cp -p oder dem Entpacken eines Archivs
+    st = ids_file.stat()
+    with open(ids_file, "ab") as f:
+        f.write(b"\n")
+    os.utime(ids_file, ns=(st.st_atime_ns, st.st_mtime_ns - 10**12))
+
+    assert ids_match_panel.load_ids_or_cache(ids_file) == ids_match_panel.parse_ids(ids_file)
+
+
+def test_sidecar_without_format_is_ignored(ids_file):
+    ids_match_panel.get_sidecar_path(ids_file).write_text('{"IFCWALL": {}}', encoding="utf-8")
+    assert ids_match_panel.load_ids_or_cache(ids_file) == ids_match_panel.parse_ids(ids_file)
@@ -0,0 +1,85 @@
+"""
+Tests for cancelling a patch run in the worker thread of ids_patch_panel.
+
+Uses stand-in patchers, so only bpy (Blender's Python or fake-bpy-module) is needed.
+"""
+
+import queue
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Scripts"))
+import ids_patch_panel  # noqa: E402
+
+
+def _progress(cancel_event, messages):
+    def report_progress(message):
+        if cancel_event.is_set():
+            raise ids_patch_panel.PatchCancelled()
+        messages.put(message)
+    return report_progress
+
+
+def test_cancel_between_types_stops_the_run(tmp_path):
+    cancel_event = threading.Event()
+    started = threading.Event()
+    resume = threading.Event()
+    output_file = tmp_path / "model_fixed.ifc"
+
+    def patcher(ifc_path, progress=None):
+        progress("Processing IfcWall")
+        started.set()
+        resume.wait(5)
+        progress("Processing IfcSlab")
+        output_file.write_text("patched")
+        return str(output_file)
+
+    future = ids_patch_panel._start_patch_worker(
+        patcher, "model.ifc", _progress(cancel_event, queue.Queue()), cancel_event)
+    assert started.wait(5)
+    cancel_event.set()
+    resume.set()
+
+    with pytest.raises(ids_patch_panel.PatchCancelled):
+        future.result(5)
+    assert not output_file.exists()
+    assert cancel_event not in ids_patch_panel._ACTIVE_RUNS
+
+
+def test_cancel_after_writing_removes_the_output(tmp_path):
+    cancel_event = threading.Event()
+    output_file = tmp_path / "model_fixed.ifc"
+
+    def patcher(ifc_path, progress=None):
+        output_file.write_text("patched")
+        cancel_event.set()  # ESC waehrend des Schreibens, nach dem letzten Check
+        return str(output_file)
+
+    future = ids_patch_panel._start_patch_worker(
+        patcher, "model.ifc", _progress(cancel_event, queue.Queue()), cancel_event)
+
+    with pytest.raises(ids_patch_panel.PatchCancelled):
+        future.result(5)
+    assert not output_file.exists()
+
+
+def test_uncancelled_run_returns_the_output(tmp_path):
+    cancel_event = threading.Event()
+    messages = queue.Queue()
+    output_file = tmp_path / "model_fixed.ifc"
+
+    def patcher(ifc_path, progress=None):
+        progress("Writing model_fixed.ifc")
+        output_file.write_text("patched")
+        return str(output_file)
+
+    future = ids_patch_panel._start_patch_worker(patcher, "model.ifc", _progress(cancel_event, messages), cancel_event)
+
+    assert future.result(5) == str(output_file)
+    assert messages.get_nowait() == "Writing model_fixed.ifc"
+    assert output_file.exists()
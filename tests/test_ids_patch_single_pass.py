@@ -0,0 +1,63 @@
+"""
+Regression test for the single-pass path of ids_patch_panel.
+
+With many configured IFC types the model is walked once over
+IfcObjectDefinition; the result has to match the per-type path, also for
+configured types outside that hierarchy.
+Needs bpy (Blender's Python or fake-bpy-module) and ifcopenshell.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bpy")
+ifcopenshell = pytest.importorskip("ifcopenshell")
+import ifcopenshell.guid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Scripts"))
+import ids_patch_panel  # noqa: E402
+
+
+def _build_model():
+    model = ifcopenshell.file(schema="IFC4")
+    for ifc_class in ("IfcWall", "IfcSlab", "IfcDoor"):
+        element = model.create_entity(ifc_class, GlobalId=ifcopenshell.guid.new())
+        pset = model.create_entity("IfcPropertySet", GlobalId=ifcopenshell.guid.new(), Name="Pset_A", HasProperties=[
+            model.create_entity("IfcPropertySingleValue", Name="Status", NominalValue=model.create_entity("IfcLabel", "x"))])
+        model.create_entity("IfcRelDefinesByProperties", GlobalId=ifcopenshell.guid.new(),
+                            RelatedObjects=[element], RelatingPropertyDefinition=pset)
+    model.create_entity("IfcMaterial", Name="Beton")
+    model.create_entity("IfcMaterial", Name="Stahl")
+    return model
+
+
+# Mindestens SINGLE_PASS_MIN_TYPES Typen, darunter IfcMaterial (kein IfcObjectDefinition)
+CONFIG = [
+    (ifc_type, ids_patch_panel._compile_type_config(
+        {"properties_values": {"Pset_A": {"replace_name": f"Pset_{ifc_type}"}}}))
+    for ifc_type in ("IfcMaterial", "IfcWall", "IfcSlab", "IfcBuildingElement", "IfcDoor",
+                     "IfcWindow", "IfcRoof", "IfcObjectDefinition")
+]
+
+
+def _run(patch):
+    model = _build_model()
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(model.schema)
+    valid_patches = list(ids_patch_panel._valid_patches(schema, CONFIG))
+    if patch is ids_patch_panel._patch_single_pass:
+        counts = patch(model, schema, valid_patches, ids_patch_panel._defined_psets, None)
+    else:
+        counts = patch(model, valid_patches, ids_patch_panel._defined_psets, None)
+    return counts, sorted(pset.Name for pset in model.by_type("IfcPropertySet"))
+
+
+def test_single_pass_matches_per_type():
+    assert len(CONFIG) >= ids_patch_panel.SINGLE_PASS_MIN_TYPES
+    single_pass = _run(ids_patch_panel._patch_single_pass)
+    per_type = _run(ids_patch_panel._patch_per_type)
+
+    assert single_pass == per_type
+    # IfcMaterial-Instanzen werden wie im Typ-Pfad mitgezaehlt
+    assert single_pass[0][0] == 2 + 3 * 3
@@ -0,0 +1,151 @@
+"""
+Regression test for the rename-only STEP fast path of ids_patch_panel.
+
+Patches the same synthetic IFC4 model once via the STEP text and once via
+ifcopenshell and compares all pset, quantity set and property names.
+Needs bpy (Blender's Python or fake-bpy-module) and ifcopenshell.
+"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bpy")
+ifcopenshell = pytest.importorskip("ifcopenshell")
+import ifcopenshell.guid
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Scripts"))
+import ids_patch_panel  # noqa: E402
+
+
+def _build_model(path):
+    """Walls and a slab with a shared pset, a quantity set and properties that need escaping."""
+    model = ifcopenshell.file(schema="IFC4")
+
+    def root(ifc_class, **attributes):
+        return model.create_entity(ifc_class, GlobalId=ifcopenshell.guid.new(), **attributes)
+
+    def single_value(name):
+        return model.create_entity("IfcPropertySingleValue", Name=name, NominalValue=model.create_entity("IfcLabel", "x"))
+
+    walls = [root("IfcWall", Name=f"Wall {i}") for i in range(3)]
+    slab = root("IfcSlab", Name="Slab")
+
+    for wall in walls:
+        pset = root("IfcPropertySet", Name="Pset_WallCommon",
+                    HasProperties=[single_value("IsExternal"), single_value("Status")])
+        quantities = root("IfcElementQuantity", Name="Qto_WallBaseQuantities",
+                          Quantities=[model.create_entity("IfcQuantityLength", Name="Length", LengthValue=1.0)])
+        root("IfcRelDefinesByProperties", RelatedObjects=[wall], RelatingPropertyDefinition=pset)
+        root("IfcRelDefinesByProperties", RelatedObjects=[wall], RelatingPropertyDefinition=quantities)
+
+    # Geteiltes Pset fuer verkettete Umbenennungen ueber zwei Typen
+    shared = root("IfcPropertySet", Name="X", HasProperties=[single_value("Material")])
+    root("IfcRelDefinesByProperties", RelatedObjects=[walls[0], slab], RelatingPropertyDefinition=shared)
+
+    model.write(str(path))
+
+
+def _names(path):
+    model = ifcopenshell.open(str(path))
+    return {
+        entity.id(): entity.Name
+        for ifc_type in ("IfcPropertySetDefinition", "IfcProperty")
+        for entity in model.by_type(ifc_type)
+    }
+
+
+def _patch(tmp_path, name, config, step):
+    ifc_file = tmp_path / name
+    shutil.copyfile(tmp_path / "model.ifc", ifc_file)
+    previous = ids_patch_panel.ENABLE_STEP_RENAME
+    ids_patch_panel.ENABLE_STEP_RENAME = step
+    try:
+        return ids_patch_panel.compile_patcher(config)(str(ifc_file))
+    finally:
+        ids_patch_panel.ENABLE_STEP_RENAME = previous
+
+
+CONFIGS = {
+    "quantity_set": {
+        "IfcWall": {"properties_values": {"Qto_WallBaseQuantities": {"replace_name": "X"}}},
+    },
+    "quantity_set_with_properties": {
+        "IfcWall": {"properties_values": {"Qto_WallBaseQuantities": {
+            "replace_name": "Mengen", "Length": {"replace_name": "Laenge"}}}},
+    },
+    "chained_shared_pset": {
+        "IfcWall": {"properties_values": {"X": {"replace_name": "Y"}}},
+        "IfcSlab": {"properties_values": {"Y": {"replace_name": "Z"}}},
+    },
+    "escaped_longer_names": {
+        "IfcWall": {"properties_values": {"Pset_WallCommon": {
+            "replace_name": "Wand 'Allgemein' \\ ü€",
+            "IsExternal": {"replace_name": "Aussenwand"},
+            "Status": {"replace_name": "S"}}}},
+    },
+    "shorter_names_in_place": {
+        "IfcBuildingElement": {"properties_values": {"Pset_WallCommon": {
+            "replace_name": "P", "IsExternal": {"replace_name": "E"}}}},
+    },
+}
+
+
+@pytest.mark.parametrize("case", sorted(CONFIGS))
+def test_step_rename_matches_ifcopenshell(tmp_path, case):
+    _build_model(tmp_path / "model.ifc")
+    config = CONFIGS[case]
+    assert ids_patch_panel._is_rename_only(
+        [(ifc_type, ids_patch_panel._compile_type_config(cfg)) for ifc_type, cfg in config.items()]
+    )
+
+    step_output = _patch(tmp_path, "step.ifc", config, step=True)
+    reference_output = _patch(tmp_path, "reference.ifc", config, step=False)
+
+    assert _names(step_output) == _names(reference_output)
+    assert _names(step_output) != _names(tmp_path / "model.ifc")
+
+
+def test_quantity_sets_are_renamed(tmp_path):
+    _build_model(tmp_path / "model.ifc")
+    output = _patch(tmp_path, "step.ifc", CONFIGS["quantity_set"], step=True)
+
+    model = ifcopenshell.open(output)
+    assert {qto.Name for qto in model.by_type("IfcElementQuantity")} == {"X"}
+
+
+def _rewrite_step_layout(path):
+    """Header comment with an apostrophe and all records after DATA; on one line."""
+    text = path.read_bytes()
+    head, data = text.split(b"DATA;\n", 1)
+    body, tail = data.split(b"ENDSEC;", 1)
+    path.write_bytes(head + b"/* don't edit */\nDATA;\n" + body.replace(b";\n", b";") + b"\nENDSEC;" + tail)
+
+
+def test_step_rename_with_comments_and_joined_records(tmp_path):
+    _build_model(tmp_path / "model.ifc")
+    _rewrite_step_layout(tmp_path / "model.ifc")
+    config = CONFIGS["escaped_longer_names"]
+
+    step_output = _patch(tmp_path, "step.ifc", config, step=True)
+    reference_output = _patch(tmp_path, "reference.ifc", config, step=False)
+
+    assert _names(step_output) == _names(reference_output)
+    assert {pset.Name for pset in ifcopenshell.open(step_output).by_type("IfcPropertySet")} == {
+        "Wand 'Allgemein' \\ ü€", "X"}
+
+
+def test_step_rename_with_commented_names(tmp_path):
+    _build_model(tmp_path / "model.ifc")
+    path = tmp_path / "model.ifc"
+    # Kommentare und Leerraum um die Name-Argumente
+    path.write_bytes(path.read_bytes().replace(b",'Pset_WallCommon',", b", /* pset */ 'Pset_WallCommon'  ,"))
+    config = CONFIGS["escaped_longer_names"]
+
+    step_output = _patch(tmp_path, "step.ifc", config, step=True)
+    reference_output = _patch(tmp_path, "reference.ifc", config, step=False)
+
+    assert _names(step_output) == _names(reference_output)
+    assert "Wand 'Allgemein' \\ ü€" in _names(step_output).values()
@@ -0,0 +1,141 @@
+"""
+Unit tests for the STEP helpers behind the rename-only fast path of ids_patch_panel.
+
+These are pure functions on bytes and need no ifcopenshell, only bpy
+(Blender's Python or fake-bpy-module) to import the panel module.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Scripts"))
+import ids_patch_panel  # noqa: E402
+
+
+def _records(text):
+    return list(ids_patch_panel._iter_step_records(io.BytesIO(text)))
+
+
+def _record_ids(text):
+    ids = []
+    for record in _records(text):
+        match = ids_patch_panel._STEP_RECORD.match(record)
+        if match is not None:
+            ids.append(int(match.group(1)))
+    return ids
+
+
+def test_records_are_contiguous():
+    text = b"DATA;\n#1=IFCWALL('a',$);\n#2=IFCSLAB('b',\n$);\nENDSEC;\n"
+    records = _records(text)
+    assert b"".join(records) == text
+    assert _record_ids(text) == [1, 2]
+
+
+def test_comment_with_apostrophe_is_skipped():
+    text = (
+        b"HEADER;\n/* don't edit */\nENDSEC;\nDATA;\n"
+        b"#1=IFCPROPERTYSET('g',$,'Pset_A',$,(#2));\n"
+        b"#2=IFCPROPERTYSINGLEVALUE('IsExternal',$,$,$);\n"
+        b"ENDSEC;\n"
+    )
+    records = _records(text)
+    assert b"".join(records) == text
+    assert b"\n/* don't edit */" in records
+    assert _record_ids(text) == [1, 2]
+
+
+def test_comment_inside_record():
+    text = b"#1=IFCWALL('a', /* it's; here */ $);\n#2=IFCSLAB('b',$);\n"
+    assert _record_ids(text) == [1, 2]
+
+
+def test_several_records_on_one_line():
+    text = b"#1=IFCWALL('a;b',$);#2=IFCSLAB('c',$); #3=IFCROOF('d',$);\n"
+    records = _records(text)
+    assert b"".join(records) == text
+    assert _record_ids(text) == [1, 2, 3]
+
+
+def test_string_spanning_lines():
+    text = b"#1=IFCWALL('it''\ns; end',$);\n#2=IFCSLAB('c',$);\n"
+    records = _records(text)
+    assert records[0] == b"#1=IFCWALL('it''\ns; end',$);"
+    assert _record_ids(text) == [1, 2]
+
+
+def test_step_arg_spans():
+    record = b"#1=IFCPROPERTYSET('g',$,'a,(b)' /* x, ) */,$,(#2,#3));"
+    match = ids_patch_panel._STEP_RECORD.match(record)
+    spans = ids_patch_panel._step_arg_spans(record, match.end())
+    args = [record[start:end] for start, end in spans]
+    assert args == [b"'g'", b"$", b"'a,(b)' /* x, ) */", b"$", b"(#2,#3)"]
+
+
+def test_step_arg_spans_unterminated():
+    record = b"#1=IFCWALL('a',(#2;"
+    match = ids_patch_panel._STEP_RECORD.match(record)
+    with pytest.raises(ValueError):
+        ids_patch_panel._step_arg_spans(record, match.end())
+
+
+@pytest.mark.parametrize("text", ["Pset_WallCommon", "Wand 'Allgemein' \\ ü€", "", "𝄞"])
+def test_step_string_roundtrip(text):
+    encoded = ids_patch_panel._encode_step_string(text)
+    assert encoded.isascii()
+    assert ids_patch_panel._decode_step_string(encoded) == text
+
+
+def test_decode_step_string_escapes():
+    assert ids_patch_panel._decode_step_string(b"'\\X2\\00FC\\X0\\ber'") == "über"
+    assert ids_patch_panel._decode_step_string(b"'\\X\\E4'") == "ä"
+    assert ids_patch_panel._decode_step_string(b"'\\S\\d'") == "ä"
+    assert ids_patch_panel._decode_step_string(b" 'it''s' ") == "it's"
+    assert ids_patch_panel._decode_step_string(b"$") is None
+    assert ids_patch_panel._decode_step_string(b"*") is None
+
+
+@pytest.mark.parametrize("arg", [b"'Pset_A'  ", b" /* name */ 'Pset_A'", b"'Pset_A' /* it's */\n"])
+def test_decode_step_string_around_whitespace_and_comments(arg):
+    assert ids_patch_panel._decode_step_string(arg) == "Pset_A"
+    assert ids_patch_panel._step_name(arg) == "Pset_A"
+
+
+@pytest.mark.parametrize("arg", [b"'Pset_A", b"'Pset_A' 'B'", b"'a''", b"#12", b"IFCLABEL('Pset_A')", b"'a' x"])
+def test_malformed_name_falls_back(arg):
+    assert ids_patch_panel._decode_step_string(arg) is None
+    with pytest.raises(ids_patch_panel.StepFormatError):
+        ids_patch_panel._step_name(arg)
+
+
+@pytest.mark.parametrize("arg", [b"$", b" * ", b"/* unset */ $"])
+def test_unset_name(arg):
+    assert ids_patch_panel._step_name(arg) is None
+
+
+def test_patcher_falls_back_on_step_format_error(tmp_path, monkeypatch):
+    ifc_file = tmp_path / "model.ifc"
+    ifc_file.write_bytes(b"ISO-10303-21;\n")
+    calls = []
+
+    def step_path(ifc_file, patches, progress):
+        calls.append("step")
+        raise ids_patch_panel.StepFormatError("Unexpected STEP name argument")
+
+    def ifcopenshell_path(ifc_file, patches, progress):
+        calls.append("ifcopenshell")
+        return "output.ifc"
+
+    monkeypatch.setattr(ids_patch_panel, "_apply_renames_step", step_path)
+    monkeypatch.setattr(ids_patch_panel, "_apply_patches", ifcopenshell_path)
+    monkeypatch.setattr(ids_patch_panel, "ENABLE_STEP_RENAME", True)
+    patcher = ids_patch_panel.compile_patcher(
+        {"IfcWall": {"properties_values": {"Pset_A": {"replace_name": "Pset_B"}}}})
+
+    assert patcher(str(ifc_file)) == "output.ifc"
+    assert calls == ["step", "ifcopenshell"]